@@ -0,0 +1,182 @@
+import os
+import time
+from pydantic import ValidationError
+from sqlalchemy import insert
+from backend.models.admin.dashboard import student
+from backend.schemas.admin.dashboard import AdmissionPayload
+from backend.roster_cache import mark_rosters_stale
+from backend.routers.state import queue_reindex
+from backend.serialization import loads
+from backend.jobs import job_runner
+
+# 🏛️ Bulk admission tuning (start-of-year imports run to thousands of rows)
+BULK_ADMIT_CHUNK = int(os.getenv("BULK_ADMIT_CHUNK", "500"))
+BULK_ADMIT_MAX_ROWS = int(os.getenv("BULK_ADMIT_MAX_ROWS", "20000"))
+# From this many rows a chunk goes through Postgres COPY instead of INSERT ... VALUES
+BULK_ADMIT_COPY_MIN = int(os.getenv("BULK_ADMIT_COPY_MIN", "200"))
+# A spreadsheet with a wrong column fails every row: don't echo thousands of errors back
+BULK_ADMIT_MAX_ERRORS = int(os.getenv("BULK_ADMIT_MAX_ERRORS", "200"))
+
+COPY_COLUMNS = ("name", "father_name", "section", "fee", "extra_fields", "admitted_by", "is_active", "institution_id")
+
+
+class AdmitReport:
+    """Running totals for one bulk admission (may span several batches/commits)."""
+
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.errors = []
+        self.failed_rows = set()
+        self.sections = set()
+        self.batches = 0  # chunk writes (write_rows calls)
+        self.started = time.perf_counter()
+
+    @property
+    def failed(self):
+        return len(self.failed_rows)
+
+    def add_error(self, row, error, field=None):
+        self.failed_rows.add(row)
+        if len(self.errors) < BULK_ADMIT_MAX_ERRORS:
+            self.errors.append({"row": row, "field": field, "error": error})
+
+    def as_dict(self):
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": len(self.errors) >= BULK_ADMIT_MAX_ERRORS,
+            "sections": sorted(self.sections),
+            "batches": self.batches,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+        }
+
+
+def validate_rows(rows, report, row_numbers):
+    """
+    Pydantic-validates one chunk. Rows carry their number (1-based list
+    position, or the sheet row for imports) so errors point at the line the
+    admin has to fix. Returns [(row_no, AdmissionPayload), ...] for the good ones.
+    """
+    valid = []
+    for row_no, raw in zip(row_numbers, rows):
+        report.received += 1
+        try:
+            payload = raw if isinstance(raw, AdmissionPayload) else AdmissionPayload.model_validate(raw)
+        except ValidationError as e:
+            for err in e.errors():
+                report.add_error(row_no, err["msg"], ".".join(str(p) for p in err["loc"]) or None)
+            continue
+        if not payload.name.strip() or not payload.section.strip():
+            report.add_error(row_no, "Name and section can't be blank", "name" if not payload.name.strip() else "section")
+            continue
+        valid.append((row_no, payload))
+    return valid
+
+
+def to_record(payload, inst_id, admitted_by):
+    return {
+        "name": payload.name,
+        "father_name": payload.father_name,
+        "section": payload.section,
+        "fee": payload.fee,
+        "extra_fields": payload.extra_fields or {},
+        "admitted_by": admitted_by,
+        "is_active": True,
+        "institution_id": inst_id,
+    }
+
+
+def copy_students(db, records):
+    """Postgres COPY ... FROM STDIN over the session's own connection (same transaction)."""
+    from psycopg.types.json import Json
+    raw = db.connection().connection.driver_connection
+    with raw.cursor() as cur:
+        with cur.copy(f"COPY {student.__tablename__} ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+            for record in records:
+                copy.write_row([Json(record[c]) if c == "extra_fields" else record[c] for c in COPY_COLUMNS])
+
+
+def insert_chunk(db, records):
+    """
+    One round-trip-ish write per chunk:
+    - Postgres + big chunk -> COPY
+    - otherwise a Core executemany, which SQLAlchemy batches into multi-row
+      INSERT ... VALUES. Core (not ORM objects) also means no per-row
+      after_insert listeners: the reindex is queued once per section instead.
+    """
+    if len(records) >= BULK_ADMIT_COPY_MIN and db.bind.dialect.name == "postgresql":
+        copy_students(db, records)
+    else:
+        db.execute(insert(student.__table__), records)
+
+
+def write_rows(db, valid, inst_id, admitted_by, report):
+    """Writes validated rows under a savepoint; a failed chunk is retried row by row to name the culprit."""
+    records = [to_record(p, inst_id, admitted_by) for _, p in valid]
+    try:
+        with db.begin_nested():
+            insert_chunk(db, records)
+        written = records
+    except Exception:
+        written = []
+        for (row_no, _), record in zip(valid, records):
+            try:
+                with db.begin_nested():
+                    db.execute(insert(student.__table__), [record])
+                written.append(record)
+            except Exception as e:
+                report.add_error(row_no, str(getattr(e, "orig", e)).splitlines()[0])
+
+    report.inserted += len(written)
+    report.batches += 1
+    sections = {r["section"] for r in written}
+    report.sections |= sections
+    if sections:
+        # Bulk statements bypass the mapper events: one reindex + cache flush per section, on commit
+        mark_rosters_stale(db, inst_id, *sections)
+        queue_reindex(db, inst_id, *sections)
+
+
+def bulk_admit(db, inst_id, admitted_by, rows, report=None, row_numbers=None, chunk_size=BULK_ADMIT_CHUNK,
+               strict=False, on_chunk=None):
+    """
+    Set-based admission of `rows` (dicts or AdmissionPayloads), chunk by chunk.
+    strict=True validates everything first and writes nothing if any row is bad.
+    on_chunk(report) runs after every written chunk (job progress).
+    Doesn't commit: the caller decides the transaction boundaries.
+    """
+    report = report or AdmitReport()
+    row_numbers = list(row_numbers) if row_numbers is not None else list(range(1, len(rows) + 1))
+    if strict:
+        valid = validate_rows(rows, report, row_numbers)
+        if report.failed:
+            return report
+        for i in range(0, len(valid), chunk_size):
+            write_rows(db, valid[i:i + chunk_size], inst_id, admitted_by, report)
+            if on_chunk: on_chunk(report)
+        return report
+
+    for i in range(0, len(rows), chunk_size):
+        valid = validate_rows(rows[i:i + chunk_size], report, row_numbers[i:i + chunk_size])
+        if valid:
+            write_rows(db, valid, inst_id, admitted_by, report)
+        if on_chunk: on_chunk(report)
+    return report
+
+
+@job_runner.register("bulk_admit")
+def run_bulk_admit_job(db, job, progress):
+    """Background twin of POST /dashboard/bulk-admit-students?background=true (same all-or-nothing rules)."""
+    rows = loads(job.payload)
+    strict = not (job.params or {}).get("skip_invalid")
+    report = bulk_admit(db, job.institution_id, job.created_by, rows, strict=strict,
+                        on_chunk=lambda r: progress(r.inserted + r.failed, len(rows), f"{r.inserted} saved"))
+    if report.failed and strict:
+        db.rollback()
+        return {"status": "rejected", "message": f"{report.failed} row(s) have errors, nothing was saved", **report.as_dict()}
+    db.commit()
+    return {"status": "success" if not report.failed else "partial",
+            "message": f"{report.inserted} students registered, {report.failed} row(s) skipped", **report.as_dict()}
@@ -0,0 +1,115 @@
+"""
+Concurrency benchmark: blocking Session I/O inside `async def` handlers
+(the old router style) versus plain `def` handlers run in the threadpool.
+
+    python -m backend.benchmarks.concurrency [requests] [latency_ms]
+
+Serves the real /dashboard/my_students and /dashboard/sections handlers
+from a throw-away SQLite file. Every SQL statement sleeps `latency_ms`
+first to stand in for the network round-trip to Postgres.
+"""
+import sys
+import time
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+import httpx
+from fastapi import FastAPI, Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.models import Base, student
+from backend.database import get_db, get_read_db
+from backend.routers import dashboard
+from backend.roster_cache import roster_cache
+from backend.routers.auth import get_current_user
+
+
+def build_db(path, latency_ms):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, pool_size=64)
+    Base.metadata.create_all(engine, tables=[student.__table__])
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([student(name=f"Student {i}", father_name=f"Father {i}", section=f"Class {i % 12}",
+                            fee=2500.0, institution_id=1, extra_fields={}) for i in range(300)])
+        db.commit()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency_ms / 1000)
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    return override_db
+
+
+def build_app(override_db, legacy):
+    app = FastAPI()
+    principal = SimpleNamespace(institution_id=1)
+
+    if legacy:
+        # Old style: the same handler bodies, awaited inline on the event loop
+        async def legacy_user():
+            return principal
+
+        @app.get("/dashboard/my_students")
+        async def my_students(db=Depends(get_db), current_user=Depends(get_current_user)):
+            # Keywords: called directly, the Query()/Depends() defaults are not resolved
+            return dashboard.get_students(limit=None, cursor=None, sort="id", fields=None, section=None,
+                                          db=db, current_user=current_user)
+
+        @app.get("/dashboard/sections")
+        async def sections(request: Request, db=Depends(get_db), current_user=Depends(get_current_user)):
+            return dashboard.get_unique_sections(request=request, db=db, current_user=current_user)
+
+        app.dependency_overrides[get_current_user] = legacy_user
+    else:
+        app.include_router(dashboard.router)
+        app.dependency_overrides[get_current_user] = lambda: principal
+
+    # Both session sources: nothing may reach the real primary/replica
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = override_db
+    return app
+
+
+async def drive(app, n_requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        paths = ["/dashboard/my_students", "/dashboard/sections"]
+        await asyncio.gather(*[client.get(p) for p in paths])  # warm-up
+
+        async def timed_get(path):
+            started = time.perf_counter()
+            response = await client.get(path)
+            assert response.status_code == 200
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*[timed_get(paths[i % 2]) for i in range(n_requests)])
+        wall = time.perf_counter() - started
+        latencies = sorted(latencies)
+        return wall, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+def main(n_requests=200, latency_ms=5):
+    roster_cache.ttl = 0  # /sections would be a cache hit: measure the handlers, not the cache
+    with tempfile.TemporaryDirectory() as tmp:
+        override_db = build_db(os.path.join(tmp, "bench.db"), latency_ms)
+        print(f"{n_requests} concurrent requests, {latency_ms} ms simulated DB round-trip")
+        results = {}
+        for label, legacy in (("async def + blocking Session", True), ("def handlers in threadpool", False)):
+            wall, p50, p95 = asyncio.run(drive(build_app(override_db, legacy), n_requests))
+            results[legacy] = wall
+            print(f"  {label:<30} {n_requests / wall:6.0f} req/s  p50 {p50:6.0f} ms  p95 {p95:6.0f} ms")
+        print(f"  throughput gain: {results[True] / results[False]:.1f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:3]
+    main(int(args[0]) if args else 200, float(args[1]) if len(args) > 1 else 5)
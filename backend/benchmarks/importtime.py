@@ -0,0 +1,74 @@
+"""
+Import-time budget: boots `backend.main` under `python -X importtime` in a
+fresh interpreter and fails when it gets slow or pulls in an SDK that must
+stay lazy.
+
+    python -m backend.benchmarks.importtime [budget_ms] [runs]
+
+The fastest of `runs` cold imports is judged: a single run swings by a few
+hundred ms with disk cache and CPU noise, the best one barely moves.
+Exit code 1 = over budget or a lazy SDK was imported at boot (CI-friendly).
+"""
+import os
+import re
+import sys
+import subprocess
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "2000"))
+IMPORT_RUNS = int(os.getenv("IMPORT_RUNS", "3"))
+
+# Only their adapters (backend.genai_client, backend.firebase_client,
+# backend.email_client, backend.roster_import) may import these, and only on first use
+LAZY_MODULES = ("google.genai", "firebase_admin", "resend", "httpx", "pandas", "openpyxl")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(target="backend.main"):
+    """Returns {module: (self_us, cumulative_us, depth)} for one cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True,
+        env={**os.environ, "DB_SCHEMA_MODE": "skip"},  # measure imports, not the DB
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"import {target} failed")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2)
+    return modules
+
+
+def main(budget_ms=IMPORT_BUDGET_MS, runs=IMPORT_RUNS):
+    samples = [measure() for _ in range(max(runs, 1))]
+    modules = min(samples, key=lambda m: m["backend.main"][1])
+    total_ms = modules["backend.main"][1] / 1000
+    # Self time summed per top-level package: where the boot time actually goes
+    by_package = {}
+    for name, (self_us, _, _) in modules.items():
+        root = name.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+
+    spread = ", ".join(f"{m['backend.main'][1] / 1000:.0f}" for m in samples)
+    print(f"import backend.main: {total_ms:.0f} ms, best of {len(samples)} [{spread}] (budget {budget_ms:.0f} ms)")
+    print("Heaviest packages (self time):")
+    for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:12]:
+        print(f"  {name:<32} {us / 1000:8.1f} ms")
+
+    leaked = [m for m in LAZY_MODULES if m in modules]
+    if leaked:
+        print(f"❌ Imported at boot but should be lazy: {', '.join(leaked)}")
+    if total_ms > budget_ms:
+        print(f"❌ Over the import budget by {total_ms - budget_ms:.0f} ms")
+    if leaked or total_ms > budget_ms:
+        raise SystemExit(1)
+    print("✅ Within budget, no lazy SDK imported at boot")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS,
+         int(sys.argv[2]) if len(sys.argv) > 2 else IMPORT_RUNS)
@@ -0,0 +1,95 @@
+"""
+Serialization benchmark: the legacy ORM + object_as_dict + json.dumps path
+versus column_rows + backend.serialization.dumps.
+
+    python -m backend.benchmarks.serialization [students] [rounds]
+
+Runs against a throw-away in-memory SQLite DB, never the app database.
+"""
+import sys
+import json
+import time
+import random
+import datetime
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from fastapi.encoders import jsonable_encoder
+
+from backend.models import Base, student, AttendanceLog
+from backend.serialization import BACKEND, column_rows, dumps
+
+
+def object_as_dict(obj):
+    """The pre-serialization-layer row converter (kept here for comparison)."""
+    d = {}
+    for c in inspect(obj).mapper.column_attrs:
+        value = getattr(obj, c.key)
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            d[c.key] = value.isoformat()
+        else:
+            d[c.key] = value
+    return d
+
+
+def seed(db, n_students):
+    sections = [f"Class {i}" for i in range(40)]
+    db.add_all([
+        student(name=f"Student {i}", father_name=f"Father {i}", section=random.choice(sections),
+                fee=2500.0, institution_id=1, extra_fields={"Phone": "0300-0000000", "Address": "Street 1"},
+                created_at=datetime.datetime(2026, 3, 1, 9, 30))
+        for i in range(n_students)
+    ])
+    db.add_all([
+        AttendanceLog(institution_id=1, section_identifier=sec, log_date=datetime.date(2026, 1, 1) + datetime.timedelta(days=d),
+                      category="class", attendance_data=[{"student_id": str(i), "status": "P"} for i in range(40)],
+                      p_count=40)
+        for sec in sections for d in range(30)
+    ])
+    db.commit()
+
+
+def timed(label, fn, rounds):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        size = len(fn())
+    per_call = (time.perf_counter() - start) / rounds * 1000
+    print(f"  {label:<48} {per_call:8.2f} ms   ({size / 1024:.0f} KiB)")
+    return per_call
+
+
+def main(n_students=3000, rounds=10):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[student.__table__, AttendanceLog.__table__])
+    db = sessionmaker(bind=engine)()
+    seed(db, n_students)
+
+    def legacy_blob():
+        db.expunge_all()
+        rows = db.query(student).all() + db.query(AttendanceLog).all()
+        return json.dumps([object_as_dict(r) for r in rows],
+                          default=lambda o: o.isoformat() if isinstance(o, (datetime.datetime, datetime.date)) else str(o))
+
+    def fast_blob():
+        return dumps(column_rows(db, student) + column_rows(db, AttendanceLog))
+
+    def legacy_response():
+        db.expunge_all()
+        return json.dumps(jsonable_encoder({"students": db.query(student).all()}))
+
+    def fast_response():
+        return dumps({"students": column_rows(db, student)})
+
+    print(f"{n_students} students, {rounds} rounds, serializer backend: {BACKEND}")
+    print("State blob:")
+    old = timed("ORM + object_as_dict + json.dumps", legacy_blob, rounds)
+    new = timed("column_rows + dumps", fast_blob, rounds)
+    print(f"  speed-up: {old / new:.1f}x")
+    print("/dashboard/my_students response:")
+    old = timed("ORM + jsonable_encoder + json.dumps", legacy_response, rounds)
+    new = timed("column_rows + dumps", fast_response, rounds)
+    print(f"  speed-up: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
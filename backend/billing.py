@@ -0,0 +1,170 @@
+import os
+import re
+import time
+import datetime
+from sqlalchemy import select, insert, exists, func, cast, literal, null, String, Float, Integer, Boolean, DateTime
+from backend.models.admin.dashboard import student, Staff
+from backend.models.admin.document import FinanceTemplate, Transaction, Voucher
+from backend.jobs import job_runner
+
+# 🏛️ Monthly billing engine: FinanceTemplate x students/staff -> vouchers, inside the database
+BILLING_CHUNK = int(os.getenv("BILLING_CHUNK", "1000"))
+
+PERIOD = re.compile(r"^\d{4}-\d{2}$")
+
+
+class BillingError(ValueError):
+    pass
+
+
+def voucher_no_prefix(template, billing_period):
+    """Idempotency key: one voucher per template, period and recipient (uq_vouchers_voucher_no)."""
+    return f"T{template.id}-{billing_period}-{'E' if template.mode == 'staff' else 'S'}"
+
+
+def recipients(template):
+    """(model, filters, name, father_name, phone, fee) for the template's target group."""
+    if template.mode == "staff":
+        return Staff, [Staff.institution_id == template.institution_id], Staff.name, null(), Staff.contact, None
+
+    filters = [student.institution_id == template.institution_id, student.is_active == True]
+    if template.target_group and template.target_group.lower() != "all":
+        filters.append(student.section == template.target_group)
+    return student, filters, student.name, student.father_name, null(), student.fee
+
+
+def particulars_sql(dialect, heads, fee_column):
+    """
+    JSON array of {name, amount} built per row in SQL, so the student's own
+    fee lands in the voucher without a round-trip. Literals are cast because
+    Postgres can't infer parameter types inside json_build_object.
+    """
+    build_array, build_object = (("json_build_array", "json_build_object") if dialect == "postgresql"
+                                 else ("json_array", "json_object"))
+    items = []
+    for head in heads:
+        amount = fee_column if head.get("source") == "student_fee" else cast(literal(float(head.get("amount") or 0)), Float)
+        items.append(getattr(func, build_object)(
+            cast(literal("name"), String), cast(literal(head["name"]), String),
+            cast(literal("amount"), String), amount,
+        ))
+    return getattr(func, build_array)(*items)
+
+
+def validate_heads(heads, mode):
+    if not heads:
+        raise BillingError("The template has no charges")
+    if mode == "staff" and any(h.get("source") == "student_fee" for h in heads):
+        raise BillingError("Staff templates can't use the student fee")
+
+
+def generate_vouchers(db, template, billing_period=None, created_by=None, chunk_size=BILLING_CHUNK, on_chunk=None):
+    """
+    Set-based voucher run for one template + billing period:
+    1. Recipients are walked in id-ordered chunks; each chunk is one
+       INSERT ... SELECT into vouchers (particulars + total computed in SQL)
+       and one into finance_transactions (the unpaid receivable), then a commit.
+    2. Anyone who already has this template's voucher for the period is skipped
+       (NOT EXISTS on voucher_no), so a re-run or a retried job only fills the gaps.
+    3. Each chunk first locks the template row: two runs of the same template
+       can't interleave and trip the unique voucher_no.
+    Returns the run summary; totals come from SQL too.
+    """
+    period = billing_period or template.billing_month
+    if not period or not PERIOD.match(period):
+        raise BillingError("billing_period must look like 2026-03")
+    heads = template.structure or []
+    validate_heads(heads, template.mode)
+
+    started = time.perf_counter()
+    model, filters, name_col, father_col, phone_col, fee_col = recipients(template)
+    prefix = voucher_no_prefix(template, period)
+    voucher_no = cast(literal(prefix), String) + cast(model.id, String)
+
+    fixed_total = sum(float(h.get("amount") or 0) for h in heads if h.get("source") != "student_fee")
+    fee_heads = sum(1 for h in heads if h.get("source") == "student_fee")
+    fee = func.coalesce(fee_col, 0) if fee_heads else None
+    total = cast(literal(fixed_total), Float)
+    if fee_heads:
+        total = total + fee * fee_heads
+    particulars = particulars_sql(db.bind.dialect.name, heads, fee)
+
+    now = datetime.datetime.utcnow()
+    voucher_cols = ["institution_ref", "recipient_type", "name", "registration_id", "father_name", "phone",
+                    "billing_period", "particulars", "total_amount", "is_paid", "created_at", "created_by",
+                    "template_id", "voucher_no"]
+    already_billed = exists().where(Voucher.voucher_no == voucher_no)
+
+    created, chunks, last_id = 0, 0, 0
+    while True:
+        # Upper id of this chunk (None = the rest fits in one go)
+        upper = db.execute(select(model.id).where(*filters, model.id > last_id)
+                           .order_by(model.id).offset(chunk_size - 1).limit(1)).scalar()
+        in_chunk = [model.id > last_id] + ([model.id <= upper] if upper is not None else [])
+
+        db.query(FinanceTemplate.id).filter(FinanceTemplate.id == template.id).with_for_update().first()
+        rows = select(
+            cast(literal(template.institution_id), Integer),
+            cast(literal(template.mode), String),
+            name_col,
+            cast(model.id, String),
+            father_col,
+            phone_col,
+            cast(literal(period), String),
+            particulars,
+            total,
+            cast(literal(False), Boolean),
+            literal(now, DateTime),  # no CAST: SQLite would turn it into a number
+            cast(literal(created_by), String),
+            cast(literal(template.id), Integer),
+            voucher_no,
+        ).where(*filters, *in_chunk, ~already_billed)
+        result = db.execute(insert(Voucher.__table__).from_select(voucher_cols, rows))
+        created += max(result.rowcount or 0, 0)
+
+        # The receivable ledger: one unpaid transaction per voucher of this run
+        db.execute(insert(Transaction.__table__).from_select(
+            ["institution_id", "template_id", "amount", "status", "voucher_no"],
+            select(Voucher.institution_ref, Voucher.template_id, Voucher.total_amount,
+                   cast(literal("unpaid"), String), Voucher.voucher_no)
+            .where(Voucher.template_id == template.id, Voucher.billing_period == period,
+                   ~exists().where(Transaction.voucher_no == Voucher.voucher_no))
+        ))
+        db.commit()
+        chunks += 1
+        if on_chunk:
+            on_chunk(created, chunks)
+        if upper is None:
+            break
+        last_id = upper
+
+    count, billed = db.execute(
+        select(func.count(Voucher.id), func.coalesce(func.sum(Voucher.total_amount), 0))
+        .where(Voucher.template_id == template.id, Voucher.billing_period == period)
+    ).one()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🏛️ Billing: template {template.id} / {period}: {created} new vouchers in {chunks} chunk(s), {elapsed:.0f} ms")
+    return {
+        "template_id": template.id,
+        "billing_period": period,
+        "created": created,
+        "already_billed": count - created,
+        "vouchers": count,
+        "billed_total": float(billed),
+        "chunks": chunks,
+        "elapsed_ms": round(elapsed, 1),
+    }
+
+
+@job_runner.register("generate_vouchers")
+def run_generate_vouchers_job(db, job, progress):
+    """Background twin of POST /document/finance/templates/{id}/generate?background=true."""
+    params = job.params or {}
+    template = db.query(FinanceTemplate).filter(
+        FinanceTemplate.id == params["template_id"],
+        FinanceTemplate.institution_id == job.institution_id
+    ).first()
+    if not template:
+        raise BillingError("Template not found")
+    return generate_vouchers(db, template, params.get("billing_period"), job.created_by,
+                             on_chunk=lambda created, chunks: progress(created, message=f"{created} vouchers, chunk {chunks}"))
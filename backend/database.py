@@ -1,34 +1,220 @@
 import os
-from sqlalchemy import create_engine
+import time
+import threading
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+def normalize_database_url(url):
+    # Render gives 'postgres://', we need 'postgresql+psycopg://'
+    # The '+psycopg' part is mandatory for Python 3.13 compatibility!
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+psycopg://", 1)
+    # Even if it's already 'postgresql://', force the '+psycopg' driver
+    return url.replace("postgresql://", "postgresql+psycopg://", 1)
+
 # 🏛️ Priority: Get the URL from Render Environment
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
 if SQLALCHEMY_DATABASE_URL:
-    # Render gives 'postgres://', we need 'postgresql+psycopg://'
-    # The '+psycopg' part is mandatory for Python 3.13 compatibility!
-    if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
-        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql+psycopg://", 1)
-    else:
-        # Even if it's already 'postgresql://', force the '+psycopg' driver
-        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+    SQLALCHEMY_DATABASE_URL = normalize_database_url(SQLALCHEMY_DATABASE_URL)
 else:
     # 🏛️ Local Fallback (Institution DB)
     SQLALCHEMY_DATABASE_URL = "sqlite:///./institution.db"
 
+# 📖 Optional read replica for search/analytics reads (unset = everything on primary)
+SQLALCHEMY_READ_URL = os.getenv("DATABASE_READ_URL")
+if SQLALCHEMY_READ_URL:
+    SQLALCHEMY_READ_URL = normalize_database_url(SQLALCHEMY_READ_URL)
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_SECONDS = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "2"))
+# A dead replica host must fail fast: requests fall back to the primary meanwhile
+DB_REPLICA_CONNECT_TIMEOUT = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+
+# 🏛️ Pool configuration (all env-driven)
+# Size it for the work that can hold a connection at once: the request
+# threadpool (THREADPOOL_MAX_WORKERS) plus the reindex workers.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# PgBouncer in transaction mode: no server-side prepared statements and no
+# session-level settings (they would leak to whoever gets the server conn next)
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            with self.stats_lock:
+                self.checkouts += 1
+                self.wait_ms_total += waited
+                self.wait_ms_max = max(self.wait_ms_max, waited)
+                if waited > 100:
+                    self.slow_checkouts += 1
+
+
+def _connect_args(url, connect_timeout=None):
+    if "sqlite" in url:
+        # Only use check_same_thread for SQLite
+        return {"check_same_thread": False}
+    args = {}
+    if connect_timeout:
+        args["connect_timeout"] = connect_timeout  # libpq, in seconds
+    if DB_PGBOUNCER:
+        args["prepare_threshold"] = None  # psycopg 3: never PREPARE
+    elif DB_STATEMENT_TIMEOUT_MS:
+        args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return args
+
+
+def build_engine(url, connect_timeout=None):
+    """Primary and replica share the same pool/timeout policy."""
+    eng = create_engine(
+        url,
+        connect_args=_connect_args(url, connect_timeout),
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS and "sqlite" not in url:
+        # Startup options are dropped by PgBouncer: scope the timeout to each transaction
+        @event.listens_for(eng, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+    return eng
+
+
 # Engine configuration
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    # Only use check_same_thread for SQLite
-    connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = build_engine(SQLALCHEMY_READ_URL, DB_REPLICA_CONNECT_TIMEOUT) if SQLALCHEMY_READ_URL else None
+
+
+def pool_stats(eng=None):
+    """Live pool occupancy plus checkout wait counters (for /health/pools)."""
+    pool = (eng or engine).pool
+    with pool.stats_lock:
+        checkouts = pool.checkouts or 1
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "checkouts": pool.checkouts,
+            "slow_checkouts": pool.slow_checkouts,
+            "timeouts": pool.timeouts,
+            "avg_wait_ms": round(pool.wait_ms_total / checkouts, 2),
+            "max_wait_ms": round(pool.wait_ms_max, 2),
+        }
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class ReplicaMonitor:
+    """
+    Decides whether reads may go to the replica:
+    1. Replay lag is sampled at most every DB_REPLICA_CHECK_SECONDS.
+    2. Lag above DB_REPLICA_MAX_LAG_SECONDS, or a replica that cannot be
+       reached, sends reads back to the primary until the next sample.
+    3. One caller runs the probe, outside the lock; the others get the last
+       verdict meanwhile instead of queueing behind a slow connect.
+    """
+
+    LAG_SQL = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+        "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, eng):
+        self.engine = eng
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._healthy = False
+        self._probing = False
+        self.lag_seconds = None
+
+    def usable(self):
+        if self.engine is None:
+            return False
+        with self._lock:
+            if self._probing or time.monotonic() - self._checked_at < DB_REPLICA_CHECK_SECONDS:
+                return self._healthy
+            self._probing = True
+
+        lag, healthy = None, False
+        try:
+            with self.engine.connect() as conn:
+                lag = float(conn.execute(self.LAG_SQL).scalar() or 0)
+            healthy = lag <= DB_REPLICA_MAX_LAG_SECONDS
+            if not healthy:
+                print(f"⚠️ Replica lag {lag:.1f}s: reads back on primary")
+        except Exception as e:
+            print(f"⚠️ Replica unreachable, reads back on primary: {e}")
+        finally:
+            with self._lock:
+                self.lag_seconds, self._healthy = lag, healthy
+                self._checked_at = time.monotonic()
+                self._probing = False
+        return healthy
+
+    def caught_up_with(self, primary_db):
+        """True when the replica has replayed everything `primary_db` has committed."""
+        if self.engine is None or not self.usable():
+            return False
+        try:
+            lsn = primary_db.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+            with self.engine.connect() as conn:
+                return bool(conn.execute(text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"), {"lsn": lsn}).scalar())
+        except Exception:
+            return False
+
+
+replica_monitor = ReplicaMonitor(read_engine)
+
+def get_read_db():
+    """
+    Replica when it is configured and fresh enough, otherwise the primary.
+    Only for reads nobody reloads right after their own write (explore
+    search, analytics): any list a screen refreshes after saving stays on
+    get_db, since a lagging replica would hand back the pre-write rows.
+    """
+    db = ReadSessionLocal() if replica_monitor.usable() else SessionLocal()
     try:
         yield db
     finally:
@@ -2,10 +2,11 @@ from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from backend import database, models
+from backend.principal_cache import load_principal
 # Import from our new clean security file
 from backend.scuirity import oauth2_scheme, SECRET_KEY, ALGORITHM
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -19,7 +20,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.user_email == email).first()
+    user = load_principal(db, email)
     if user is None:
         raise credentials_exception
     return user
\ No newline at end of file
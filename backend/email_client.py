@@ -0,0 +1,21 @@
+import os
+import threading
+
+# resend is only needed when a code actually goes out: import it on first send
+_resend = None
+_lock = threading.Lock()
+
+
+def get_resend():
+    global _resend
+    if _resend is None:
+        with _lock:
+            if _resend is None:
+                import resend
+                resend.api_key = os.getenv("RESEND_API_KEY", "your_key_here")
+                _resend = resend
+    return _resend
+
+
+def send_email(params: dict):
+    return get_resend().Emails.send(params)
@@ -0,0 +1,60 @@
+import os
+import json
+import time
+import threading
+
+# This gets the directory where 'backend' folder lives (the project root)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIREBASE_CRED_PATH = os.getenv("FIREBASE_CRED_PATH", os.path.join(BASE_DIR, "firebase-adminsdk.json"))
+
+_init_lock = threading.Lock()
+_init_failed = False
+
+
+def get_firebase_app():
+    """
+    The single Firebase Admin init, done on first use instead of at import:
+    1. FIREBASE_JSON (Render env var) wins, the key file is the local fallback.
+    2. A failed init is remembered, so we don't retry it on every push.
+    Returns the app, or None when Firebase is not configured.
+    firebase_admin itself is imported here too, so workers that never push
+    or verify a social login never load it.
+    """
+    global _init_failed
+    import firebase_admin
+    from firebase_admin import credentials
+    if firebase_admin._apps:
+        return firebase_admin.get_app()
+    with _init_lock:
+        if firebase_admin._apps:
+            return firebase_admin.get_app()
+        if _init_failed:
+            return None
+        started = time.perf_counter()
+        try:
+            cred_json = os.getenv("FIREBASE_JSON")
+            if cred_json:
+                cred = credentials.Certificate(json.loads(cred_json))
+            else:
+                cred = credentials.Certificate(FIREBASE_CRED_PATH)
+            app = firebase_admin.initialize_app(cred)
+            print(f"✅ Firebase initialized ({(time.perf_counter() - started) * 1000:.0f} ms)")
+            return app
+        except Exception as e:
+            _init_failed = True
+            print(f"❌ Firebase Init Error: {e}")
+            return None
+
+
+def get_messaging():
+    """firebase_admin.messaging, with the app initialized."""
+    get_firebase_app()
+    from firebase_admin import messaging
+    return messaging
+
+
+def get_auth():
+    """firebase_admin.auth, with the app initialized."""
+    get_firebase_app()
+    from firebase_admin import auth as firebase_auth
+    return firebase_auth
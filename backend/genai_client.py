@@ -0,0 +1,24 @@
+import os
+import threading
+
+# google-genai is heavy to import: loaded on the first scan, not at boot
+_client = None
+_types = None
+_lock = threading.Lock()
+
+
+def get_genai():
+    """Returns (client, types) for Gemini, importing and building the client once."""
+    global _client, _types
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from google import genai
+                from google.genai import types
+                # Initialize client - Gemini 3 Flash is accessed via the latest SDK
+                _client = genai.Client(
+                    api_key=os.environ.get("GOOGLE_AI_KEY"),
+                    http_options=types.HttpOptions(api_version="v1beta")
+                )
+                _types = types
+    return _client, _types
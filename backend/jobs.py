@@ -0,0 +1,211 @@
+import os
+import time
+import uuid
+import socket
+import datetime
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from backend.database import SessionLocal
+from backend.models.job import BackgroundJob
+
+# 🏛️ Long operations run here instead of inside the request
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "50"))  # queued + running, per process
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "1"))  # seconds between progress writes
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+
+ACTIVE = ("queued", "running")
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Progress:
+    """
+    Handed to job handlers: progress(done, total=None, message=None).
+    Live numbers are in memory at once; the job row is only written every
+    JOB_PROGRESS_INTERVAL seconds (own short session, so it never commits
+    the handler's half-done work).
+    """
+
+    def __init__(self, runner, job_id):
+        self.runner = runner
+        self.job_id = job_id
+        self._last_write = 0.0
+
+    def __call__(self, done, total=None, message=None):
+        values = {"done": done}
+        if total is not None: values["total"] = total
+        if message is not None: values["message"] = message
+        self.runner._live[self.job_id] = {**self.runner._live.get(self.job_id, {}), **values}
+
+        now = time.monotonic()
+        if now - self._last_write >= JOB_PROGRESS_INTERVAL:
+            self._last_write = now
+            self.runner._update(self.job_id, heartbeat_at=datetime.datetime.utcnow(), **values)
+
+
+class JobRunner:
+    """
+    In-process, DB-backed job runner:
+    1. submit() stores the job row (params + optional payload bytes) and queues it.
+    2. A bounded pool (JOB_MAX_WORKERS) runs handlers registered per kind;
+       each gets its own Session and a Progress callback.
+    3. Results/errors persist on the row; failed jobs keep their input for retry().
+    4. A heartbeat marks the rows this process owns, so a job orphaned by a
+       restart shows up as failed (and retryable) instead of 'running' forever.
+    """
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS, max_pending=JOB_MAX_PENDING):
+        self.max_pending = max_pending
+        self.handlers = {}
+        self._live = {}  # job_id -> latest progress values
+        self._owned = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._heartbeat = None
+
+    def register(self, kind):
+        """Decorator: @job_runner.register("bulk_admit") def handler(db, job, progress) -> result dict"""
+        def wrap(fn):
+            self.handlers[kind] = fn
+            return fn
+        return wrap
+
+    def submit(self, db, kind, institution_id, created_by=None, params=None, payload=None, total=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = BackgroundJob(
+            id=uuid.uuid4().hex, kind=kind, institution_id=institution_id, created_by=created_by,
+            params=params, payload=payload, total=total, status="queued",
+            message="Waiting for a worker", worker=WORKER_ID, heartbeat_at=datetime.datetime.utcnow(),
+        )
+        with self._lock:
+            if len(self._owned) >= self.max_pending:
+                raise JobQueueFull()
+            self._owned.add(job.id)
+        try:
+            db.add(job)
+            db.commit()
+        except Exception:
+            with self._lock: self._owned.discard(job.id)
+            raise
+        self._queue(job.id)
+        return job
+
+    def retry(self, db, job):
+        """Re-queues a failed job with the input it was submitted with."""
+        with self._lock:
+            if len(self._owned) >= self.max_pending:
+                raise JobQueueFull()
+            self._owned.add(job.id)
+        # 'done' is left alone: resumable handlers (roster_import) continue after it
+        job.status, job.error, job.result = "queued", None, None
+        job.message = "Waiting for a worker (retry)"
+        job.worker, job.heartbeat_at, job.finished_at = WORKER_ID, datetime.datetime.utcnow(), None
+        db.commit()
+        self._queue(job.id)
+        return job
+
+    def status(self, db, job):
+        """Row + live in-memory progress; a dead owner's job is flipped to failed."""
+        if job.status in ACTIVE and self.is_orphaned(job):
+            self._finish(job.id, "failed", error="Interrupted: the server restarted while this job was running")
+            db.refresh(job)
+        data = {
+            "id": job.id, "kind": job.kind, "status": job.status,
+            "done": job.done, "total": job.total, "message": job.message,
+            "result": job.result, "error": job.error, "attempts": job.attempts,
+            "created_at": job.created_at, "started_at": job.started_at, "finished_at": job.finished_at,
+        }
+        if job.status == "running":
+            data.update(self._live.get(job.id, {}))
+        return data
+
+    def is_orphaned(self, job):
+        if job.worker == WORKER_ID:
+            return job.id not in self._owned
+        beat = job.heartbeat_at or job.created_at
+        return beat is None or (datetime.datetime.utcnow() - beat).total_seconds() > JOB_HEARTBEAT_SECONDS * 4
+
+    def stats(self):
+        with self._lock:
+            owned = len(self._owned)
+        return {"pending": owned, "running": len(self._live), "max_pending": self.max_pending}
+
+    # --- internals ---
+
+    def _queue(self, job_id):
+        self._ensure_heartbeat()
+        self._pool.submit(self._run, job_id)
+
+    def _update(self, job_id, **values):
+        try:
+            with SessionLocal() as s:
+                s.query(BackgroundJob).filter(BackgroundJob.id == job_id).update(values, synchronize_session=False)
+                s.commit()
+        except Exception as e:
+            print(f"Job {job_id} progress write failed: {e}")
+
+    def _finish(self, job_id, status, result=None, error=None):
+        values = {"status": status, "result": result, "error": error, "finished_at": datetime.datetime.utcnow()}
+        if status == "succeeded":
+            values["payload"] = None  # input no longer needed once it went through
+        values.update({k: v for k, v in self._live.pop(job_id, {}).items() if k in ("done", "total", "message")})
+        self._update(job_id, **values)
+        with self._lock:
+            self._owned.discard(job_id)
+
+    def _run(self, job_id):
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            job = db.get(BackgroundJob, job_id)
+            if job is None:
+                return
+            handler = self.handlers[job.kind]
+            job.status, job.started_at, job.attempts = "running", datetime.datetime.utcnow(), (job.attempts or 0) + 1
+            job.message = "Running"
+            db.commit()
+            self._live[job_id] = {"done": job.done or 0, "total": job.total, "message": "Running"}
+
+            result = handler(db, job, Progress(self, job_id))
+            db.commit()
+            self._finish(job_id, "succeeded", result=result)
+            print(f"🏛️ Job {job.kind} {job_id} done in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            db.rollback()
+            print(f"Job Error {job_id}: {traceback.format_exc()}")
+            self._finish(job_id, "failed", error=str(e) or e.__class__.__name__)
+        finally:
+            db.close()
+            with self._lock:
+                self._owned.discard(job_id)
+
+    def _ensure_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="jobs-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(JOB_HEARTBEAT_SECONDS)
+            with self._lock:
+                owned = list(self._owned)
+            if not owned:
+                continue
+            try:
+                with SessionLocal() as s:
+                    s.query(BackgroundJob).filter(BackgroundJob.id.in_(owned)).update(
+                        {"heartbeat_at": datetime.datetime.utcnow()}, synchronize_session=False)
+                    s.commit()
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+
+
+job_runner = JobRunner()
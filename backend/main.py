@@ -1,7 +1,9 @@
+from backend.startup import startup_timer, ensure_schema  # first: starts the boot clock
 import os
+import anyio
 from fastapi import FastAPI , Depends
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import engine
+from backend.database import engine, read_engine, pool_stats, replica_monitor
 from backend.models import Base # This triggers __init__.py which loads all models
 import logging
 from backend.routers import auth
@@ -13,42 +15,24 @@ from backend.routers import ready
 from backend.routers import central_vault
 from backend.routers import scanner
 from backend.routers import state
-import firebase_admin
-from firebase_admin import auth, credentials
-import json
+from backend.routers import jobs
 from backend.routers import auth, institution, profile # Your actual router paths
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from backend.routers.auth import get_current_user
+from backend.password_policy import apply_password_policy
+from backend.password_pool import password_pool
+from backend.routers.state import reindex_scheduler
+from backend.jobs import job_runner
 
-Base.metadata.create_all(bind=engine)
+startup_timer.mark("imports")
+
+# 🏛️ Schema: a fingerprint check instead of reflecting every table on every boot
+# (DB_SCHEMA_MODE=auto|strict|create_all|skip). Firebase & co. init lazily on first use.
+with startup_timer.phase("schema"):
+    ensure_schema(engine, Base.metadata)
 logging.getLogger("passlib").setLevel(logging.ERROR)
 os.environ["PASSLIB_BUILTIN_BCRYPT"] = "enabled"
 
-# 1. PLACE IT HERE (Global Scope)
-def init_firebase():
-    if not firebase_admin._apps:
-        # We look for the Environment Variable you set in Render
-        cred_json = os.getenv("FIREBASE_JSON")
-        if cred_json:
-            try:
-                cred_dict = json.loads(cred_json)
-                cred = credentials.Certificate(cred_dict)
-                firebase_admin.initialize_app(cred)
-                print("✅ Firebase initialized via Env Var")
-            except Exception as e:
-                print(f"❌ Firebase Init Error: {e}")
-        else:
-            print("⚠️ FIREBASE_JSON not found. Notifications will fail.")
-
-# Execute immediately on startup
-init_firebase()
-
-app = FastAPI(title="Starlight Institution Manager")
-
-# Include your routers below
-app.include_router(auth.router, prefix="/auth", tags=["Auth"])
-# ... rest of your code
-
 app = FastAPI(title="Starlight Institution Manager")
 
 app.include_router(auth.router)
@@ -60,12 +44,46 @@ app.include_router(document.router)
 app.include_router(central_vault.router)
 app.include_router(scanner.router)
 app.include_router(state.router)
+app.include_router(jobs.router)
+
+# Sync (def) handlers run in AnyIO's threadpool: size it with the DB pool in mind
+THREADPOOL_MAX_WORKERS = int(os.getenv("THREADPOOL_MAX_WORKERS", "40"))
+
+@app.on_event("startup")
+def size_threadpool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_MAX_WORKERS
+
+@app.on_event("startup")
+def tune_password_hashing():
+    # 🔐 Benchmark this host once and pick the hashing cost for it
+    with startup_timer.phase("password policy"):
+        apply_password_policy()
+
+@app.on_event("startup")
+def report_startup():
+    # Registered last: runs once every other startup step is done
+    startup_timer.report()
 
 @app.get("/")
 async def health_check():
     # This tells Render "I am alive and ready for Starlight!"
     return {"status": "online", "service": "Starlight Super Console"}
 
+@app.get("/health/startup")
+def startup_health():
+    return {"phases_ms": startup_timer.phases}
+
+@app.get("/health/pools")
+def pool_health():
+    # 📊 Pool pressure at a glance: DB checkouts, password hashing, reindex backlog
+    return {
+        "database": pool_stats(),
+        "replica": {**pool_stats(read_engine), "lag_seconds": replica_monitor.lag_seconds} if read_engine else None,
+        "password_hashing": password_pool.stats(),
+        "reindex_pending": reindex_scheduler.pending_count(),
+        "jobs": job_runner.stats(),
+    }
+
 @app.get("/dashboard")
 async def get_dashboard_data():
     return {
@@ -0,0 +1,55 @@
+"""
+Additive column sync for tables that already exist.
+
+    python -m backend.migrations.columns
+
+create_all never alters an existing table, so a column added to a model
+(e.g. vouchers.template_id) is added here with ALTER TABLE ... ADD COLUMN.
+Only nullable columns without a server default are handled: on PostgreSQL
+that is a catalog-only change (no table rewrite, no long lock). Anything
+else still needs a hand-written migration. backend.migrations.schema runs
+this before the missing indexes are built.
+"""
+from sqlalchemy import inspect
+
+from backend.models import Base
+
+
+def missing_columns(engine, metadata=Base.metadata):
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # create_all builds new tables whole
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                yield column
+
+
+def add_column_ddl(column, dialect):
+    preparer = dialect.identifier_preparer
+    ddl = (f"ALTER TABLE {preparer.format_table(column.table)} "
+           f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=dialect)}")
+    for fk in column.foreign_keys:
+        ddl += f" REFERENCES {preparer.format_table(fk.column.table)} ({preparer.format_column(fk.column)})"
+    return ddl
+
+
+def add_missing_columns(engine, metadata=Base.metadata):
+    added = []
+    for column in list(missing_columns(engine, metadata)):
+        name = f"{column.table.name}.{column.name}"
+        if column.primary_key or not column.nullable or column.server_default is not None:
+            print(f"⚠️ Column {name} can't be added automatically: write a migration for it")
+            continue
+        with engine.begin() as conn:
+            conn.exec_driver_sql(add_column_ddl(column, engine.dialect))
+        added.append(name)
+        print(f"🏛️ Column added: {name}")
+    return added
+
+
+if __name__ == "__main__":
+    from backend.database import engine
+    added = add_missing_columns(engine)
+    print(f"{len(added)} column(s) added" if added else "✅ No missing columns")
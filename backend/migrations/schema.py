@@ -0,0 +1,35 @@
+"""
+Schema sync for a deploy: run it once, before the new workers start.
+
+    python -m backend.migrations.schema
+
+1. create_all builds tables that don't exist yet.
+2. Missing columns (columns.py) and indexes (tenant_indexes.py) are added
+   to the tables that do.
+3. The models' fingerprint is recorded: ensure_schema() at boot only
+   compares against it, so workers never run DDL themselves.
+"""
+from backend.models import Base
+from backend.startup import schema_fingerprint, stored_fingerprint, record_fingerprint
+from backend.migrations.columns import add_missing_columns
+from backend.migrations.tenant_indexes import create_missing_indexes
+
+
+def sync_schema(engine, metadata=Base.metadata):
+    fingerprint = schema_fingerprint(metadata)
+    if stored_fingerprint(engine) == fingerprint:
+        print("✅ Schema already up to date")
+        return False
+
+    metadata.create_all(bind=engine)
+    # create_all skips new columns and indexes on tables that already exist
+    add_missing_columns(engine, metadata)
+    create_missing_indexes(engine, metadata)
+    record_fingerprint(engine, fingerprint)
+    print(f"🏛️ Schema synced (fingerprint {fingerprint[:12]})")
+    return True
+
+
+if __name__ == "__main__":
+    from backend.database import engine
+    sync_schema(engine)
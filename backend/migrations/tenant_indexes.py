@@ -0,0 +1,131 @@
+"""
+Tenant-filter indexes for an existing database, plus an EXPLAIN check that
+the hot queries actually use them.
+
+    python -m backend.migrations.tenant_indexes           # create the missing indexes
+    python -m backend.migrations.tenant_indexes --check   # EXPLAIN regression check
+
+create_all never adds an index to a table that already exists, so the index
+set declared on the models (__table_args__) is applied here. On PostgreSQL
+each index is built CONCURRENTLY so attendance/voucher writes keep flowing.
+backend.migrations.schema runs this step as part of the schema sync.
+"""
+import sys
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.schema import CreateIndex
+
+from backend.models import (
+    Base, student, teacher, Staff, AcademicResult, AttendanceLog,
+    Syllabus, PaperVault, Voucher, SecurityLog, UserBan,
+)
+
+
+def missing_indexes(engine, metadata=Base.metadata):
+    inspector = inspect(engine)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # create_all builds new tables with their indexes
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                yield index
+
+
+def create_missing_indexes(engine, metadata=Base.metadata):
+    created = []
+    for index in list(missing_indexes(engine, metadata)):
+        if engine.dialect.name == "postgresql":
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            ddl = ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)  # plain or UNIQUE
+            # CONCURRENTLY cannot run inside a transaction block
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql(ddl)
+        else:
+            index.create(bind=engine, checkfirst=True)
+        created.append(index.name)
+        print(f"🏛️ Index created: {index.name}")
+    return created
+
+
+# The query shapes the routers run, one per hot endpoint / extraction step
+HOT_QUERIES = [
+    ("dashboard/my_students", student, select(student.id).where(
+        student.institution_id == 1, student.is_active == True).order_by(student.id)),
+    ("dashboard/my_students?sort=name", student, select(student.id).where(
+        student.institution_id == 1, student.is_active == True,
+        tuple_(student.name, student.id) > ("M", 0)).order_by(student.name, student.id).limit(50)),
+    ("dashboard/students/{section}", student, select(student.id).where(
+        student.institution_id == 1, student.section == "A", student.is_active == True).order_by(student.name)),
+    ("dashboard/sections", student, select(student.section).where(
+        student.institution_id == 1, student.is_active == True).distinct()),
+    ("dashboard/teacher-list", teacher, select(teacher.id).where(teacher.institution_id == 1)),
+    ("state: personal_state shard", Staff, select(Staff.id).where(Staff.institution_id == 1)),
+    ("state: section results", AcademicResult, select(AcademicResult.id).where(
+        AcademicResult.institution_id == 1, AcademicResult.target_class == "A")),
+    ("state: section attendance", AttendanceLog, select(AttendanceLog.id).where(
+        AttendanceLog.institution_id == 1, AttendanceLog.section_identifier == "A")),
+    ("document/pending-marksheets", AcademicResult, select(AcademicResult.id).where(
+        AcademicResult.institution_id == 1, AcademicResult.status == "pending").order_by(AcademicResult.created_at.desc())),
+    ("document/academic/finalize-results", AcademicResult, select(AcademicResult.id).where(
+        AcademicResult.institution_id == 1, AcademicResult.exam_title == "Mid", AcademicResult.target_class == "A",
+        AcademicResult.status == "DRAFT")),
+    ("central_vault/vault/list", Syllabus, select(Syllabus.id).where(
+        Syllabus.institution_ref == 1).order_by(Syllabus.created_at.desc())),
+    ("document/pending/list", Syllabus, select(Syllabus.id).where(
+        Syllabus.institution_ref == 1, Syllabus.doc_type == "pending_syllabus")),
+    ("document/papers/vault-list", PaperVault, select(PaperVault.id).where(
+        PaperVault.institution_ref == 1, PaperVault.status == "pending")),
+    ("vouchers by billing period", Voucher, select(Voucher.id).where(
+        Voucher.institution_ref == 1, Voucher.billing_period == "2026-01")),
+    ("finance: template billing run", Voucher, select(Voucher.id).where(
+        Voucher.template_id == 1, Voucher.billing_period == "2026-01")),
+    ("auth/login security log", SecurityLog, select(SecurityLog.id).where(SecurityLog.user_id == 1)),
+    ("auth/login ban check", UserBan, select(UserBan.id).where(UserBan.user_id == 1, UserBan.is_banned == True)),
+]
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        # Tiny tables make a seq scan "cheapest"; with it disabled the planner
+        # still falls back to one when no usable index exists
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        return [r[0] for r in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+    return [r[-1] for r in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def is_seq_scan(plan_lines, table_name):
+    for line in plan_lines:
+        if f"Seq Scan on {table_name}" in line or f'Seq Scan on "{table_name}"' in line:
+            return True
+        if line.strip() in (f"SCAN {table_name}", f"SCAN TABLE {table_name}"):
+            return True
+    return False
+
+
+def check(engine):
+    """EXPLAIN every hot query shape; returns the labels that fell back to a full scan."""
+    failures = []
+    with engine.connect() as conn:
+        for label, model, stmt in HOT_QUERIES:
+            with conn.begin():
+                plan = explain(conn, stmt)
+            table_name = model.__table__.name
+            if is_seq_scan(plan, table_name):
+                failures.append(label)
+                print(f"  ❌ {label:<38} full scan of {table_name}")
+            else:
+                used = next((l.strip() for l in plan if "ndex" in l), plan[0].strip())
+                print(f"  ✅ {label:<38} {used}")
+    return failures
+
+
+if __name__ == "__main__":
+    from backend.database import engine
+    if "--check" in sys.argv:
+        failed = check(engine)
+        if failed:
+            raise SystemExit(f"{len(failed)} hot queries without a usable index")
+    else:
+        created = create_missing_indexes(engine)
+        print(f"Done: {len(created)} index(es) created")
@@ -103,7 +103,7 @@ class Student(User):
 class UserBan(Base, TimestampMixin):
     __tablename__ = "user_bans"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # We use ban_count to track history; it shouldn't be a primary key
     ban_count = Column(Integer, default=0)
@@ -182,7 +182,7 @@ class Auth_id(Base):
 class SecurityLog(Base):
     __tablename__ = "security_logs"
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     resend_count = Column(Integer, default=0)
     blocked_until = Column(DateTime, nullable=True)
     last_attempt = Column(DateTime, default=datetime.utcnow)
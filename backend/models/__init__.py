@@ -8,7 +8,8 @@ from .admin.document import (
     AttendanceLog, IndividualAttendance
 )
 from .admin.dashboard import Staff, student, teacher
-from backend.models.state import InstitutionState
+from backend.models.state import InstitutionState, InstitutionShard
+from backend.models.job import BackgroundJob
 
 __all__ = [
     "Base", "User", "UserBan", "Report", "Block", "Verification",
@@ -17,5 +18,6 @@ __all__ = [
     "Transaction", "FinanceTemplate", "Voucher", 
     "AcademicResult", "PaperVault", "AttendanceLog", 
     "IndividualAttendance", "student", "Staff", "teacher",
-    "Owner", "Admin" , "Teacher" , "Student" , "Auth_id" , "SecurityLog" , "InstitutionState"
+    "Owner", "Admin" , "Teacher" , "Student" , "Auth_id" , "SecurityLog" , "InstitutionState",
+    "InstitutionShard", "BackgroundJob"
 ]
\ No newline at end of file
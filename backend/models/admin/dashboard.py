@@ -1,13 +1,19 @@
 import uuid
 from sqlalchemy import Text
 
-from sqlalchemy import Column, Integer, String, Boolean, Float, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Float, JSON, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship, DeclarativeBase
 from sqlalchemy.sql import func
 from backend.models.base import Base
 
 class student(Base):
     __tablename__ = "students"
+    # 🏛️ Tenant-first indexes: every query here starts from institution_id
+    __table_args__ = (
+        Index("ix_students_inst_section_name", "institution_id", "section", "name"),  # rosters, rename, shards
+        Index("ix_students_inst_active_id", "institution_id", "is_active", "id"),     # my_students
+        Index("ix_students_inst_active_name", "institution_id", "is_active", "name", "id"),  # my_students?sort=name
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     father_name = Column(String, nullable=False)
@@ -23,6 +29,7 @@ class student(Base):
 
 class teacher(Base):
     __tablename__ = "teacher_records"
+    __table_args__ = (Index("ix_teacher_records_inst", "institution_id"),)
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     subject_expertise = Column(String)  # Specific to teachers
@@ -37,6 +44,7 @@ class teacher(Base):
 
 class Staff(Base):
     __tablename__ = "staff"
+    __table_args__ = (Index("ix_staff_inst", "institution_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
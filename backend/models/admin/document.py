@@ -1,12 +1,16 @@
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, Boolean, func, Float, Date
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, Boolean, func, Float, Date, Index
 from sqlalchemy.orm import relationship
 from backend.models.base import Base
 from sqlalchemy.dialects.postgresql import JSONB
 
 class Syllabus(Base):
     __tablename__ = "Syllabus"
+    __table_args__ = (
+        Index("ix_syllabus_inst_created", "institution_ref", "created_at"),  # vault list (newest first)
+        Index("ix_syllabus_inst_type", "institution_ref", "doc_type"),       # pending drafts
+    )
     id = Column(Integer, primary_key=True, index=True)
     institution_ref = Column(Integer, ForeignKey('institutions.id'), nullable=False)
     name = Column(String, nullable=False)
@@ -78,6 +82,11 @@ class Transaction(Base):
 
 class Voucher(Base):
     __tablename__ = "vouchers"
+    __table_args__ = (
+        Index("ix_vouchers_inst_period", "institution_ref", "billing_period"),
+        Index("ix_vouchers_template_period", "template_id", "billing_period"),  # billing engine runs
+        Index("uq_vouchers_voucher_no", "voucher_no", unique=True),  # one voucher per template/period/recipient
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     institution_ref = Column(Integer, ForeignKey('institutions.id'), nullable=False)
@@ -96,10 +105,18 @@ class Voucher(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     created_by = Column(String)
 
+    # Set by the template billing engine (backend/billing.py); NULL on hand-built vouchers
+    template_id = Column(Integer, ForeignKey("finance_templates.id"), nullable=True)
+    voucher_no = Column(String, nullable=True)
+
     institution = relationship("Institution", back_populates="vouchers")
 
 class AcademicResult(Base):
     __tablename__ = "academic_results"
+    __table_args__ = (
+        Index("ix_results_inst_status_created", "institution_id", "status", "created_at"),  # pending marksheets
+        Index("ix_results_inst_class_exam", "institution_id", "target_class", "exam_title"),  # shards, finalize
+    )
     id = Column(Integer, primary_key=True, index=True)
     institution_id = Column(Integer, ForeignKey('institutions.id'), nullable=False)
 
@@ -119,6 +136,7 @@ class AcademicResult(Base):
 
 class PaperVault(Base):
     __tablename__ = "paper_vault"
+    __table_args__ = (Index("ix_paper_vault_inst_status", "institution_ref", "status"),)
     id = Column(Integer, primary_key=True, index=True)
     institution_ref = Column(Integer, ForeignKey('institutions.id'), nullable=False)
     subject = Column(String, nullable=False)
@@ -136,6 +154,7 @@ class PaperVault(Base):
 
 class AttendanceLog(Base):
     __tablename__ = "attendance_logs"
+    __table_args__ = (Index("ix_attendance_inst_section_date", "institution_id", "section_identifier", "log_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     institution_id = Column(Integer, ForeignKey('institutions.id'), nullable=False)
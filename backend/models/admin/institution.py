@@ -51,6 +51,7 @@ class Institution(Base, TimestampMixin):
     attendance_logs = relationship("AttendanceLog", back_populates="institution")
     individual_attendances = relationship("IndividualAttendance", back_populates="institution")
     states = relationship("InstitutionState", back_populates="institution")
+    state_shards = relationship("InstitutionShard", back_populates="institution")
 
     # ❌ REMOVED: profile relationship. Access profiles via institution.admins[x].profile
 
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, LargeBinary, Index
+from sqlalchemy.orm import deferred
+from backend.database import Base
+import datetime
+
+class BackgroundJob(Base):
+    """One long operation (bulk admission, roster import, result deploy, ...) run by backend.jobs."""
+    __tablename__ = "background_jobs"
+    __table_args__ = (Index("ix_background_jobs_inst_created", "institution_id", "created_at"),)
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex: unguessable, safe to hand out
+    institution_id = Column(Integer, ForeignKey("institutions.id"), nullable=False)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued | running | succeeded | failed
+
+    # Progress: done / total units (rows, vouchers, ...) + a human line for the UI
+    done = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=True)
+    message = Column(String, nullable=True)
+
+    # Input is kept until the job succeeds so a failed run can be retried without re-uploading
+    params = Column(JSON, nullable=True)
+    payload = deferred(Column(LargeBinary, nullable=True))
+
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_by = Column(String, nullable=True)
+    worker = Column(String, nullable=True)  # host:pid that owns it while queued/running
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, LargeBinary
 from backend.database import Base
 import datetime
 from sqlalchemy.orm import relationship
@@ -11,9 +11,32 @@ class InstitutionState(Base):
     # Correctly points to 'institutions.id' from your institution.py
     institution_id = Column(Integer, ForeignKey("institutions.id"), unique=True)
 
+    # Legacy single-blob storage: shard payloads now live in InstitutionShard.
+    # Kept as '{}' once an institution has been migrated to per-shard rows.
     full_data_blob = Column(Text, nullable=False)
     key_registry = Column(Text, nullable=False)
     last_indexed = Column(DateTime, default=datetime.datetime.utcnow)
 
     # Change 'institutions' to 'institution' to match your other models
-    institution = relationship("Institution", back_populates="states")
\ No newline at end of file
+    institution = relationship("Institution", back_populates="states")
+
+class InstitutionShard(Base):
+    """One row per section / 'personal_state' so a shard is read and written on its own."""
+    __tablename__ = "institution_state_shards"
+    __table_args__ = (UniqueConstraint("institution_id", "shard_name", name="uq_inst_shard"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    institution_id = Column(Integer, ForeignKey("institutions.id"), nullable=False, index=True)
+    shard_name = Column(String, nullable=False)
+
+    payload = Column(Text, nullable=False)
+    key = Column(String(64), nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+
+    # Content hash of 'payload' (served as the ETag) + pre-compressed bodies
+    etag = Column(String(64), nullable=True)
+    payload_gzip = Column(LargeBinary, nullable=True)
+    payload_br = Column(LargeBinary, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    institution = relationship("Institution", back_populates="state_shards")
@@ -0,0 +1,112 @@
+import os
+import math
+import time
+from passlib.hash import bcrypt, argon2
+from backend.scuirity import pwd_context
+
+# 🔐 Hashing policy: which scheme new hashes use and how expensive they are.
+# Cost is picked per node by timing this host, so every login costs roughly
+# PASSWORD_TARGET_MS of CPU instead of whatever passlib defaults to.
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "argon2")
+PASSWORD_TARGET_MS = float(os.getenv("PASSWORD_TARGET_MS", "250"))
+
+# Fixed overrides skip the benchmark for that scheme
+PASSWORD_BCRYPT_ROUNDS = os.getenv("PASSWORD_BCRYPT_ROUNDS")
+PASSWORD_ARGON2_TIME_COST = os.getenv("PASSWORD_ARGON2_TIME_COST")
+
+PASSWORD_ARGON2_MEMORY_KIB = int(os.getenv("PASSWORD_ARGON2_MEMORY_KIB", "19456"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+
+# Never calibrate below these, however slow the host is
+BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS = 10, 16
+ARGON2_MIN_TIME_COST, ARGON2_MAX_TIME_COST = 2, 10
+
+PROBE_SECRET = "starlight-calibration-probe"
+
+
+def _time_hash_ms(handler, samples=3):
+    best = None
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(PROBE_SECRET)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate_bcrypt(target_ms=PASSWORD_TARGET_MS):
+    """bcrypt cost doubles per round: time a cheap probe and extrapolate."""
+    if PASSWORD_BCRYPT_ROUNDS:
+        return int(PASSWORD_BCRYPT_ROUNDS)
+    probe_rounds = BCRYPT_MIN_ROUNDS
+    probe_ms = _time_hash_ms(bcrypt.using(rounds=probe_rounds))
+    rounds = probe_rounds + round(math.log2(max(target_ms / probe_ms, 1e-6)))
+    return min(max(rounds, BCRYPT_MIN_ROUNDS), BCRYPT_MAX_ROUNDS)
+
+
+def calibrate_argon2(target_ms=PASSWORD_TARGET_MS):
+    """Memory stays fixed; argon2 time cost scales roughly linearly."""
+    if PASSWORD_ARGON2_TIME_COST:
+        return int(PASSWORD_ARGON2_TIME_COST)
+    probe_ms = _time_hash_ms(argon2.using(
+        type="ID", rounds=1,
+        memory_cost=PASSWORD_ARGON2_MEMORY_KIB,
+        parallelism=PASSWORD_ARGON2_PARALLELISM,
+    ))
+    time_cost = int(target_ms // max(probe_ms, 0.001))
+    return min(max(time_cost, ARGON2_MIN_TIME_COST), ARGON2_MAX_TIME_COST)
+
+
+def argon2_available():
+    try:
+        argon2.get_backend()
+        return True
+    except Exception:
+        return False
+
+
+def build_policy(target_ms=PASSWORD_TARGET_MS):
+    """
+    Returns the CryptContext settings for this node:
+    1. The primary scheme signs new hashes; the other stays verifiable.
+    2. deprecated="auto" marks hashes in the non-primary scheme for upgrade.
+    3. min_rounds is the calibrated cost, so weaker hashes get upgraded but a
+       slower node never downgrades a hash made by a faster one.
+    Only the primary scheme is benchmarked: the other one is never written.
+    """
+    scheme = PASSWORD_SCHEME
+    if scheme == "argon2" and not argon2_available():
+        print("⚠️ argon2 backend not installed, staying on bcrypt")
+        scheme = "bcrypt"
+
+    policy = {
+        "schemes": [scheme] + [s for s in ("bcrypt", "argon2") if s != scheme],
+        "deprecated": "auto",
+    }
+    if scheme == "argon2":
+        time_cost = calibrate_argon2(target_ms)
+        policy.update({
+            "argon2__type": "ID",
+            "argon2__rounds": time_cost,
+            "argon2__min_rounds": time_cost,
+            "argon2__memory_cost": PASSWORD_ARGON2_MEMORY_KIB,
+            "argon2__parallelism": PASSWORD_ARGON2_PARALLELISM,
+        })
+    else:
+        rounds = calibrate_bcrypt(target_ms)
+        policy.update({"bcrypt__rounds": rounds, "bcrypt__min_rounds": rounds})
+        # argon2 stays verifiable only if its backend is installed
+        if not argon2_available():
+            policy["schemes"].remove("argon2")
+    return policy
+
+
+def apply_password_policy(target_ms=PASSWORD_TARGET_MS):
+    """Benchmarks the host and loads the policy into the shared pwd_context."""
+    started = time.perf_counter()
+    policy = build_policy(target_ms)
+    pwd_context.load(policy)
+    elapsed = (time.perf_counter() - started) * 1000
+    cost = policy.get("argon2__rounds", policy.get("bcrypt__rounds"))
+    print(f"🔐 Password policy: {policy['schemes'][0]} cost={cost} (target {target_ms:.0f} ms, calibrated in {elapsed:.0f} ms)")
+    return policy
@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from backend.scuirity import pwd_context
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+# without letting a login rush eat every core (or every request thread).
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "256"))
+PASSWORD_HASH_SLOW_QUEUE_MS = float(os.getenv("PASSWORD_HASH_SLOW_QUEUE_MS", "1000"))
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt hash/verify on its own few threads:
+    1. At most `workers` hashes run at once; the rest wait in the pool queue.
+    2. Past `max_queue` waiting jobs we answer 503 instead of piling up work.
+    3. Queue wait and run time are tracked so a rush shows up in stats().
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_ms_total = 0.0
+        self._queue_ms_max = 0.0
+        self._run_ms_total = 0.0
+
+    def run(self, fn, *args):
+        """Blocking: called from def handlers, which already sit on a threadpool thread."""
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(status_code=503, detail="Server busy, please retry login in a moment.")
+            self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            return self._pool.submit(self._timed, submitted, fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _timed(self, submitted, fn, *args):
+        started = time.perf_counter()
+        queue_ms = (started - submitted) * 1000
+        try:
+            return fn(*args)
+        finally:
+            run_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._completed += 1
+                self._queue_ms_total += queue_ms
+                self._queue_ms_max = max(self._queue_ms_max, queue_ms)
+                self._run_ms_total += run_ms
+            if queue_ms > PASSWORD_HASH_SLOW_QUEUE_MS:
+                print(f"Password Pool: job waited {queue_ms:.0f} ms in queue ({self._in_flight} in flight)")
+
+    def stats(self):
+        with self._lock:
+            done = self._completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "waiting": max(self._in_flight - self.workers, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_ms": round(self._queue_ms_total / done, 2),
+                "max_queue_ms": round(self._queue_ms_max, 2),
+                "avg_run_ms": round(self._run_ms_total / done, 2),
+            }
+
+
+password_pool = PasswordHashPool()
+
+
+def hash_password(password: str) -> str:
+    return password_pool.run(pwd_context.hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    """(ok, new_hash): new_hash is set when the stored hash is below policy."""
+    return password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,133 @@
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from backend.database import SessionLocal
+from backend.models.User import User, UserBan
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "2048"))
+
+
+class PrincipalCache:
+    """
+    Short-TTL, size-bounded (LRU) map: token subject (email) -> column snapshot
+    of the polymorphic user row. Snapshots, not ORM objects, are cached so every
+    request gets its own instance bound to its own session. Mutable (JSON)
+    values are copied in and out, so no two requests share a dict or list.
+    """
+
+    def __init__(self, ttl=PRINCIPAL_CACHE_TTL, max_size=PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # email -> (expires_at, cls, values)
+        self._emails_by_id = {}
+        self._lock = threading.Lock()
+
+    def get(self, email):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._forget(email)
+                return None
+            self._entries.move_to_end(email)
+            return entry[1], entry[2]
+
+    def put(self, user):
+        cls = type(user)
+        values = snapshot_copy({a.key: getattr(user, a.key) for a in inspect(cls).column_attrs})
+        with self._lock:
+            self._entries[user.user_email] = (time.monotonic() + self.ttl, cls, values)
+            self._entries.move_to_end(user.user_email)
+            self._emails_by_id[user.id] = user.user_email
+            while len(self._entries) > self.max_size:
+                self._forget(next(iter(self._entries)))
+
+    def invalidate(self, email=None, user_id=None):
+        with self._lock:
+            if email is None and user_id is not None:
+                email = self._emails_by_id.get(user_id)
+            if email is not None:
+                self._forget(email)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._emails_by_id.clear()
+
+    def _forget(self, email):
+        entry = self._entries.pop(email, None)
+        if entry is not None:
+            self._emails_by_id.pop(entry[2].get("id"), None)
+
+
+def snapshot_copy(values):
+    """Scalars are shared as-is; dict/list column values get a private deep copy."""
+    return {k: copy.deepcopy(v) if isinstance(v, (dict, list)) else v for k, v in values.items()}
+
+
+principal_cache = PrincipalCache()
+
+
+def load_principal(db: Session, email: str):
+    """
+    Resolves the token subject to a User bound to `db`.
+    Cache hit: the snapshot is attached with merge(load=False), no SELECT.
+    Cache miss: the usual polymorphic lookup, then cached.
+    """
+    hit = principal_cache.get(email)
+    if hit is not None:
+        cls, values = hit
+        user = cls(**snapshot_copy(values))
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.user_email == email).first()
+    if user is not None:
+        principal_cache.put(user)
+    return user
+
+
+def invalidate_principal(email=None, user_id=None):
+    """Explicit hook for role changes, bans and password resets."""
+    principal_cache.invalidate(email=email, user_id=user_id)
+
+
+# --- INVALIDATION LISTENERS ---
+# Any write to a user row (role/type, password, institution link, fcm token)
+# or to a ban drops the entry, on flush and again once committed so a request
+# racing the transaction cannot re-cache the old row for a whole TTL.
+
+def _mark_user(mapper, connection, target):
+    invalidate_principal(email=target.user_email, user_id=target.id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add((target.user_email, target.id))
+
+def _mark_ban(mapper, connection, target):
+    invalidate_principal(user_id=target.user_id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add((None, target.user_id))
+
+def _flush_stale_principals(session):
+    if session.in_nested_transaction():
+        return  # savepoint released, not the real commit
+    for email, user_id in session.info.pop("stale_principals", ()):
+        invalidate_principal(email=email, user_id=user_id)
+
+for _event in ("after_update", "after_delete"):
+    event.listen(User, _event, _mark_user, propagate=True)
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(UserBan, _event, _mark_ban)
+event.listen(SessionLocal, "after_commit", _flush_stale_principals)
+def _discard_stale_principals(session):
+    if not session.in_nested_transaction():
+        session.info.pop("stale_principals", None)
+
+event.listen(SessionLocal, "after_rollback", _discard_stale_principals)
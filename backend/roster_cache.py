@@ -0,0 +1,111 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from sqlalchemy import event, inspect
+from backend.database import SessionLocal
+from backend.models.admin.dashboard import student
+
+# TTL only bounds staleness across workers: in-process writes invalidate at once
+ROSTER_CACHE_TTL = float(os.getenv("ROSTER_CACHE_TTL", "60"))
+ROSTER_CACHE_SIZE = int(os.getenv("ROSTER_CACHE_SIZE", "4096"))
+
+# Section None = the institution's list of section names
+SECTIONS = None
+
+
+class RosterCache:
+    """
+    Versioned (institution, section) -> serialized roster:
+    1. Every write bumps the key's version, which orphans the cached body.
+    2. A reader records the version before querying and only stores its
+       result if no write bumped it meanwhile, so a slow read can't cache
+       data that is already stale.
+    3. Bodies are kept pre-serialized with their ETag for 304s.
+    """
+
+    def __init__(self, ttl=ROSTER_CACHE_TTL, max_size=ROSTER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key -> (version, expires_at, etag, body)
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def version(self, key):
+        with self._lock:
+            return self._versions[key]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != self._versions[key] or entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[2], entry[3]
+
+    def put(self, key, version, body: bytes):
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            if self._versions[key] == version:
+                self._entries[key] = (version, time.monotonic() + self.ttl, etag, body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return etag, body
+
+    def bump(self, inst_id, section):
+        """A section changed: its roster and the institution's section list are stale."""
+        with self._lock:
+            for key in ((inst_id, section), (inst_id, SECTIONS)):
+                self._versions[key] += 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+roster_cache = RosterCache()
+
+
+def mark_rosters_stale(session, inst_id, *sections):
+    """
+    For writes the mapper events can't see (bulk query.update / inserts):
+    invalidates now and again once the session commits.
+    """
+    for section in sections:
+        roster_cache.bump(inst_id, section)
+    session.info.setdefault("stale_rosters", set()).update((inst_id, s) for s in sections)
+
+
+# --- INVALIDATION LISTENERS ---
+# admit / edit / delete go through the ORM; the old section counts too when
+# a student is moved, since that roster just lost someone.
+
+def _mark_student(mapper, connection, target):
+    sections = [target.section] + list(inspect(target).attrs.section.history.deleted or [])
+    session = inspect(target).session
+    for section in dict.fromkeys(s for s in sections if s):
+        roster_cache.bump(target.institution_id, section)
+        if session is not None:
+            session.info.setdefault("stale_rosters", set()).add((target.institution_id, section))
+
+def _flush_stale_rosters(session):
+    # Readers between flush and commit still saw the old rows: bump once more
+    if session.in_nested_transaction():
+        return  # savepoint released, not the real commit
+    for inst_id, section in session.info.pop("stale_rosters", ()):
+        roster_cache.bump(inst_id, section)
+
+def _discard_stale_rosters(session):
+    if not session.in_nested_transaction():
+        session.info.pop("stale_rosters", None)
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(student, _event, _mark_student)
+event.listen(SessionLocal, "after_commit", _flush_stale_rosters)
+event.listen(SessionLocal, "after_rollback", _discard_stale_rosters)
@@ -0,0 +1,197 @@
+import io
+import os
+import re
+from backend.admissions import AdmitReport, bulk_admit
+from backend.jobs import job_runner
+
+# 🏛️ Spreadsheet admissions: parsed on the server, a batch at a time
+ROSTER_IMPORT_BATCH = int(os.getenv("ROSTER_IMPORT_BATCH", "1000"))
+ROSTER_IMPORT_MAX_BYTES = int(os.getenv("ROSTER_IMPORT_MAX_BYTES", str(25 * 1024 * 1024)))
+
+CSV_EXTENSIONS = (".csv", ".txt")
+XLSX_EXTENSIONS = (".xlsx", ".xlsm")
+
+# Header spellings seen on real admission sheets -> AdmissionPayload field.
+# Anything else in the sheet is kept in extra_fields under its own header.
+COLUMN_ALIASES = {
+    "name": ("name", "student name", "student", "full name", "student full name"),
+    "father_name": ("father name", "father", "fathers name", "father's name", "guardian", "guardian name", "parent name"),
+    "section": ("section", "class", "class section", "class/section", "grade"),
+    "fee": ("fee", "fees", "monthly fee", "tuition fee", "fee amount"),
+}
+REQUIRED_FIELDS = ("name", "father_name", "section", "fee")
+
+
+class RosterImportError(ValueError):
+    """The file itself can't be read (format, encoding, missing columns)."""
+
+
+def normalize_header(header):
+    return re.sub(r"[\s_\-]+", " ", str(header or "").strip().lower())
+
+
+def resolve_columns(headers, mapping=None):
+    """
+    Sheet header -> AdmissionPayload field (or None = extra_fields):
+    1. The explicit `mapping` ({"Student Name": "name"}) wins.
+    2. Otherwise the first header matching an alias claims the field.
+    """
+    explicit = {normalize_header(k): v for k, v in (mapping or {}).items()}
+    unknown = set(explicit.values()) - set(REQUIRED_FIELDS) - {None, "extra_fields"}
+    if unknown:
+        raise RosterImportError(f"Mapping targets unknown field(s): {', '.join(sorted(map(str, unknown)))}")
+
+    aliases = {alias: field for field, names in COLUMN_ALIASES.items() for alias in names}
+    columns, claimed = {}, set()
+    for header in headers:
+        key = normalize_header(header)
+        field = explicit[key] if key in explicit else aliases.get(key)
+        if field in claimed or field == "extra_fields":
+            field = None
+        columns[header] = field
+        if field:
+            claimed.add(field)
+    return columns
+
+
+def to_admission(values, columns, defaults):
+    """One sheet row -> AdmissionPayload-shaped dict (validation happens in bulk_admit)."""
+    row, extra = dict(defaults), {}
+    for header, value in values.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        field = columns.get(header)
+        if field == "fee" and isinstance(value, str):
+            value = value.replace(",", "")  # "2,500"
+        if field:
+            row[field] = value
+        elif header is not None:
+            extra[str(header).strip()] = value if isinstance(value, (int, float, bool)) else str(value)
+    row["extra_fields"] = extra
+    return row
+
+
+def csv_batches(fileobj, batch_size):
+    """pandas chunked reader: yields (headers, [(sheet_row_no, {header: value}), ...])."""
+    import pandas as pd  # heavy: only workers that import a sheet pay for it
+    reader = pd.read_csv(fileobj, chunksize=batch_size, dtype=str, keep_default_na=False,
+                         skip_blank_lines=False, encoding="utf-8-sig")
+    for frame in reader:
+        headers = list(frame.columns)
+        # Row 1 is the header line, so data row i sits on sheet row i + 2
+        yield headers, [(int(i) + 2, rec) for i, rec in zip(frame.index, frame.to_dict("records"))]
+
+
+def xlsx_batches(fileobj, batch_size):
+    """openpyxl read-only mode streams the sheet XML; pandas.read_excel would load it whole."""
+    from openpyxl import load_workbook
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = list(next(rows, ()) or ())
+        batch = []
+        for row_no, values in enumerate(rows, start=2):
+            batch.append((row_no, dict(zip(headers, values))))
+            if len(batch) >= batch_size:
+                yield headers, batch
+                batch = []
+        if batch:
+            yield headers, batch
+    finally:
+        workbook.close()
+
+
+def reader_for(filename):
+    name = (filename or "").lower()
+    if name.endswith(XLSX_EXTENSIONS):
+        return xlsx_batches
+    if name.endswith(CSV_EXTENSIONS):
+        return csv_batches
+    raise RosterImportError("Upload a .csv or .xlsx file (old .xls: save it as .xlsx first)")
+
+
+def import_roster(db, inst_id, admitted_by, fileobj, filename, mapping=None, defaults=None,
+                  batch_size=ROSTER_IMPORT_BATCH, on_progress=None, checkpoint=None, start_after_row=0):
+    """
+    Streams a CSV/XLSX roster into the students table:
+    1. The file is read `batch_size` rows at a time, so memory stays flat.
+    2. Every batch goes through bulk_admit and is committed on its own;
+       bad rows are reported by sheet row number and skipped.
+    3. checkpoint(report) runs just before each commit (same transaction),
+       on_progress(report) right after it. report.last_row is the last sheet
+       row handled, and start_after_row resumes after it.
+    Returns (report, columns).
+    """
+    reader = reader_for(filename)
+    defaults = {k: v for k, v in (defaults or {}).items() if v not in (None, "")}
+    report = AdmitReport()
+    report.last_row = start_after_row
+    columns = None
+    try:
+        for batch_no, (headers, numbered) in enumerate(reader(fileobj, batch_size), start=1):
+            if columns is None:
+                columns = resolve_columns(headers, mapping)
+                missing = [f for f in REQUIRED_FIELDS if f not in columns.values() and f not in defaults]
+                if missing:
+                    raise RosterImportError(f"No column found for: {', '.join(missing)}. Rename the header or send a column mapping.")
+
+            last_row = numbered[-1][0] if numbered else report.last_row
+            # Blank lines (Excel's formatted-but-empty tail) are skipped, numbering is kept
+            numbered = [(n, v) for n, v in numbered
+                        if n > start_after_row and any(x not in (None, "") for x in v.values())]
+            if numbered:
+                bulk_admit(db, inst_id, admitted_by, [to_admission(v, columns, defaults) for _, v in numbered],
+                           report=report, row_numbers=[n for n, _ in numbered])
+            report.last_row = max(report.last_row, last_row)
+            if checkpoint:
+                checkpoint(report)
+            db.commit()
+            print(f"🏛️ Roster import: batch {batch_no}, {report.inserted} saved / {report.failed} failed so far")
+            if on_progress:
+                on_progress(report)
+    except RosterImportError:
+        db.rollback()
+        raise
+    except UnicodeDecodeError:
+        db.rollback()
+        raise RosterImportError("The CSV isn't UTF-8: export it again as 'CSV UTF-8'")
+    except Exception as e:
+        db.rollback()
+        if columns is None:
+            raise RosterImportError(f"Couldn't read the file: {e}")
+        raise
+
+    if columns is None:
+        raise RosterImportError("The file has no header row")
+    return report, columns
+
+
+@job_runner.register("roster_import")
+def run_roster_import_job(db, job, progress):
+    """
+    Background twin of POST /dashboard/import-students. job.done holds the
+    last committed sheet row, written in each batch's own transaction, so a
+    retry picks up after it instead of admitting the same students twice.
+    """
+    params = job.params or {}
+    resumed_from = job.done or 0
+
+    def checkpoint(report):
+        job.done = report.last_row
+        job.message = f"{report.inserted} saved, {report.failed} skipped (sheet row {report.last_row})"
+
+    report, columns = import_roster(
+        db, job.institution_id, job.created_by, io.BytesIO(job.payload), params.get("filename"),
+        mapping=params.get("mapping"), defaults=params.get("defaults"),
+        checkpoint=checkpoint, start_after_row=resumed_from,
+        on_progress=lambda r: progress(r.last_row, message=job.message),
+    )
+    return {
+        "status": "success" if not report.failed else "partial",
+        "message": f"{report.inserted} students registered, {report.failed} row(s) skipped",
+        "columns": {str(k): v for k, v in columns.items()},
+        "resumed_after_row": resumed_from,
+        **report.as_dict(),
+    }
@@ -1,7 +1,5 @@
 import os
-import httpx
 import random
-import resend
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Body, status
@@ -11,20 +9,19 @@ from dotenv import load_dotenv
 from backend.scuirity import pwd_context, SECRET_KEY, ALGORITHM, oauth2_scheme
 from .. import database
 from backend.database import get_db
+from backend.principal_cache import load_principal, invalidate_principal
+from backend.password_pool import hash_password, verify_and_update
 from backend.schemas.User.login import UserCreate , LoginSchema , Token , SyncStateResponse , FcmToken
 from backend.models.admin.institution import Institution
 from backend.models.User import User , UserBan , Verification , Auth_id  , SecurityLog
-import firebase_admin
-from firebase_admin import auth, credentials , messaging
 import json
-from firebase_admin import auth as firebase_auth
+from backend.firebase_client import get_messaging, get_auth
+from backend.email_client import send_email
 
 load_dotenv()
 
 raw_expiry = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(raw_expiry)
-resend.api_key = os.getenv("RESEND_API_KEY", "your_key_here")
-firebase_json_str = os.getenv("FIREBASE_JSON")
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-for-dev")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 router = APIRouter(
@@ -33,23 +30,7 @@ router = APIRouter(
 )
 
 # 🏛️ Institutional Intelligence: Secure Activation
-
-
-if not firebase_admin._apps:
-    try:
-        if firebase_json_str:
-            # Parse the Render environment variable
-            firebase_info = json.loads(firebase_json_str)
-            cred = credentials.Certificate(firebase_info)
-            firebase_admin.initialize_app(cred)
-            print("🚀 Core Online: Auth & Messaging Services Reactivated")
-        else:
-            # Fallback for local testing
-            cred = credentials.Certificate("firebase-adminsdk.json")
-            firebase_admin.initialize_app(cred)
-            print("⚠️ Core: Using local fallback key")
-    except Exception as e:
-        print(f"❌ Critical Failure: Could not activate Firebase: {e}")
+# Firebase is initialized once, on first use, by backend.firebase_client
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -57,7 +38,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     # 🏛️ Define this at the very start so it's resolved for the whole function
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,7 +55,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         # 🏛️ This now works because credentials_exception is in scope
         raise credentials_exception
 
-    user = db.query(User).filter(User.user_email == email).first()
+    # Short-TTL principal cache: skips the polymorphic multi-join lookup on hits
+    user = load_principal(db, email)
     if user is None:
         raise credentials_exception
 
@@ -88,7 +70,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def send_email_task(email: str, name: str, code: str, subject="Your Verification Code"):
     try:
-        resend.Emails.send({
+        send_email({
         "from": "Institution Portal <auth@institution.site>",
         "to": [email],
         "subject": subject,
@@ -123,7 +105,7 @@ def get_verified_inst(current_user: User = Depends(get_current_user), db: Sessio
 
 # auth.py
 @router.patch("/users/update-push-token") # Use PATCH to match your JS
-async def update_token(
+def update_token(
         data: FcmToken, # Uses your schema
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
@@ -138,7 +120,7 @@ async def update_token(
 
 firebase_key = os.getenv("FIREBASE_JSON")
 
-async def notify_user(fcm_token: str, title: str, body: str):
+def notify_user(fcm_token: str, title: str, body: str):
     """
     The 'Delivery Truck': Takes a token and tells Firebase to push it.
     """
@@ -148,6 +130,7 @@ async def notify_user(fcm_token: str, title: str, body: str):
 
     try:
         # 1. Create the Message Envelope
+        messaging = get_messaging()
         message = messaging.Message(
             notification=messaging.Notification(
                 title=title,
@@ -166,7 +149,7 @@ async def notify_user(fcm_token: str, title: str, body: str):
         return False
 
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: User = Depends(get_current_user)):
     # The @property magic happens here
     profile = current_user.active_profile
 
@@ -180,10 +163,9 @@ async def get_me(current_user: User = Depends(get_current_user)):
     }
 
 @router.post("/signup")
-async def signup(user: UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def signup(user: UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     email_str = str(user.email).lower().strip()
     otp = "".join([str(random.randint(0, 9)) for _ in range(6)])
-    hashed_pwd = pwd_context.hash(user.password)
 
     # 🏛️ Step 1: Check the Permanent User table first
     existing_user = db.query(User).filter(User.user_email == email_str).first()
@@ -193,6 +175,9 @@ async def signup(user: UserCreate, background_tasks: BackgroundTasks, db: Sessio
         if existing_user.type in ["owner", "teacher", "admin", "student"]:
             raise HTTPException(status_code=400, detail="Institution email already registered. Please login.")
 
+    # bcrypt runs in the bounded password pool
+    hashed_pwd = hash_password(user.password)
+
     # 🏛️ Step 2: Check the Verification table (Pending users)
     # Search by email, NOT ID, to avoid polymorphic mapper crashes
     v_user = db.query(Verification).filter(Verification.user_email == email_str).first()
@@ -221,7 +206,7 @@ async def signup(user: UserCreate, background_tasks: BackgroundTasks, db: Sessio
     return {"status": "success", "message": "Verification code sent to email."}
 
 @router.post("/login", response_model=Token)
-async def login(credentials: LoginSchema, db: Session = Depends(get_db)):
+def login(credentials: LoginSchema, db: Session = Depends(get_db)):
     # 1. Fetch User
     user = db.query(User).filter(User.user_email == credentials.email).first()
 
@@ -241,7 +226,8 @@ async def login(credentials: LoginSchema, db: Session = Depends(get_db)):
         )
 
     # 3. Credential Verification
-    if not verify_password(credentials.password, user.user_password):
+    verified, upgraded_hash = verify_and_update(credentials.password, user.user_password)
+    if not verified:
         # 🏛️ Handle Failure: Increment attempts
         if not sec_log:
             sec_log = SecurityLog(user_id=user.id, attempts=1)
@@ -273,6 +259,12 @@ async def login(credentials: LoginSchema, db: Session = Depends(get_db)):
     if ban_status:
         raise HTTPException(status_code=403, detail=f"Account suspended: {ban_status.ban_reason}")
 
+    # 🔐 Old scheme / weaker cost than the current policy: re-hash now,
+    # the only moment we hold the plain password
+    if upgraded_hash:
+        user.user_password = upgraded_hash
+        db.commit()
+
     # 🏛️ 6. SUCCESS: Reset Security & Save FCM Token
     if sec_log:
         sec_log.attempts = 0
@@ -302,7 +294,7 @@ async def login(credentials: LoginSchema, db: Session = Depends(get_db)):
 
 # 🏛️ VERIFY LOGIC (10 Attempts Limit)
 @router.post("/verify-action")
-async def verify_action(payload: dict = Body(...), db: Session = Depends(get_db)):
+def verify_action(payload: dict = Body(...), db: Session = Depends(get_db)):
     email = payload.get("email")
     otp_received = payload.get("otp")
 
@@ -332,7 +324,7 @@ async def verify_action(payload: dict = Body(...), db: Session = Depends(get_db)
 
 # 🏛️ RESEND LOGIC (5 Times Limit)
 @router.post("/resend-otp")
-async def resend_otp(payload: dict = Body(...), db: Session = Depends(get_db)):
+def resend_otp(payload: dict = Body(...), db: Session = Depends(get_db)):
     email = payload.get("email")
     v_user = db.query(Verification).filter(Verification.user_email == email).first()
     sec_log = db.query(SecurityLog).filter(SecurityLog.user_id == v_user.id).first()
@@ -355,7 +347,7 @@ async def resend_otp(payload: dict = Body(...), db: Session = Depends(get_db)):
 
 
 @router.post("/forgot-password")
-async def forgot_password(payload: dict = Body(...), background_tasks: BackgroundTasks = None, db: Session = Depends(get_db)):
+def forgot_password(payload: dict = Body(...), background_tasks: BackgroundTasks = None, db: Session = Depends(get_db)):
     email = payload.get("email")
     v_user = db.query(Verification).filter(Verification.user_email == email).first()
 
@@ -370,7 +362,7 @@ async def forgot_password(payload: dict = Body(...), background_tasks: Backgroun
     return {"message": "Reset code sent"}
 
 @router.post("/reset-password")
-async def reset_password_confirm(payload: dict = Body(...), db: Session = Depends(get_db)):
+def reset_password_confirm(payload: dict = Body(...), db: Session = Depends(get_db)):
     # We query Verification to ensure we can clear the OTP
     v_user = db.query(Verification).filter(Verification.user_email == payload.get("email")).first()
 
@@ -380,10 +372,11 @@ async def reset_password_confirm(payload: dict = Body(...), db: Session = Depend
     v_user.user_password = hash_password(payload.get("new_password"))
     v_user.otp_code = None
     db.commit()
+    invalidate_principal(email=v_user.user_email, user_id=v_user.id)
     return {"message": "Password updated successfully"}
 
 @router.get("/sync-state", response_model=SyncStateResponse)
-async def sync_user_state(
+def sync_user_state(
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user) # Logic: Get user from token
 ):
@@ -407,7 +400,7 @@ async def sync_user_state(
     }
 
 @router.get("/send-notification/{user_email}")
-async def manual_push(user_email: str, db: Session = Depends(get_db)):
+def manual_push(user_email: str, db: Session = Depends(get_db)):
     # 1. Search DB by email
     user = db.query(User).filter(User.user_email == user_email).first()
 
@@ -418,7 +411,7 @@ async def manual_push(user_email: str, db: Session = Depends(get_db)):
         return {"status": "error", "message": "User has no device registered."}
 
     # 2. Trigger the notification
-    success = await notify_user(
+    success = notify_user(
         user.fcm_token,
         "Core Systems Online",
         f"Hello {user.user_email}, system check complete."
@@ -430,7 +423,7 @@ async def manual_push(user_email: str, db: Session = Depends(get_db)):
         return {"status": "error", "message": "Firebase rejected the delivery."}
 
 @router.get("/check-existence")
-async def check_existence(email: str, db: Session = Depends(get_db)):
+def check_existence(email: str, db: Session = Depends(get_db)):
     """
     Super Console Hydration:
     Returns full user state to enable offline functionality.
@@ -455,14 +448,14 @@ async def check_existence(email: str, db: Session = Depends(get_db)):
     }
 
 @router.post("/social-sync") # Added /auth/ prefix to match frontend
-async def social_sync(payload: dict, db: Session = Depends(get_db)):
+def social_sync(payload: dict, db: Session = Depends(get_db)):
     id_token = payload.get("token")
     provider = payload.get("provider")
     provided_name = payload.get("name")
 
     try:
         # 1. Verify with Firebase (This checks if the token is real and not expired)
-        decoded_token = firebase_auth.verify_id_token(id_token)
+        decoded_token = get_auth().verify_id_token(id_token)
         f_uid = decoded_token.get("uid")
         f_email = decoded_token.get("email")
         f_name = decoded_token.get("name") or provided_name or "Institution Member"
@@ -17,7 +17,7 @@ router = APIRouter(
 # --- 1. FETCH ALL SYLLABUS DOCS ---
 # CORRECTED: Use the response_model to ensure proper serialization
 @router.get("/vault/list", response_model=List[SyllabusResponse])
-async def get_syllabus_list(
+def get_syllabus_list(
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user) # Changed dict to Any or your User model
 ):
@@ -41,7 +41,7 @@ async def get_syllabus_list(
 
 # --- 2. UPDATE SYLLABUS ---
 @router.put("/vault/update/{doc_id}")
-async def update_syllabus(
+def update_syllabus(
         doc_id: int,
         payload: VaultUpload,
         db: Session = Depends(get_db),
@@ -77,7 +77,7 @@ async def update_syllabus(
         raise HTTPException(status_code=500, detail="Failed to update content")
 
 @router.post("/vault/delete-bulk")
-async def delete_syllabus_bulk(
+def delete_syllabus_bulk(
         payload: dict = Body(...),
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
@@ -109,7 +109,7 @@ async def delete_syllabus_bulk(
         raise HTTPException(status_code=500, detail="Delete failed")
 
 @router.get("/papers/history-list")
-async def get_history_papers(
+def get_history_papers(
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
 ):
@@ -1,6 +1,7 @@
 import json
 from typing import Dict
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -41,7 +42,8 @@ chat_manager = ChatManager()
 async def chat_endpoint(websocket: WebSocket, token: str, db: Session = Depends(get_db)):
     # 1. Secure Handshake: Verify JWT
     try:
-        user = await get_current_user(token, db)
+        # get_current_user is sync now (DB lookup) -> keep it off the loop
+        user = await run_in_threadpool(get_current_user, token, db)
     except Exception:
         await websocket.close(code=1008)
         return
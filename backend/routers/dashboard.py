@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+import os
+import base64
+from typing import Optional, Literal, Any
+from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from sqlalchemy import func, inspect, tuple_
 from sqlalchemy.orm import Session
 from backend.routers.auth import get_current_user
 from .. import database
 from backend.database import get_db
+from backend.serialization import column_rows, FastJSONResponse, dumps, loads
+from backend.admissions import bulk_admit, BULK_ADMIT_MAX_ROWS
+from backend.roster_import import import_roster, reader_for, RosterImportError, ROSTER_IMPORT_MAX_BYTES
+from backend.routers.jobs import queue_job
+from backend.roster_cache import roster_cache, mark_rosters_stale, SECTIONS
+from backend.routers.state import etag_matches, queue_reindex
 from backend.models.admin.dashboard import student , Staff , teacher
 from  backend.models.admin.institution import Institution
 from backend.schemas.admin.dashboard import AdmissionPayload, Student_update, TeacherCreate, TeacherListResponse, StaffCreate,StaffResponse, StaffListResponse, EmployeeUpdate, StaffUpdate
@@ -16,7 +26,7 @@ router = APIRouter(
 
 
 @router.post("/admit-student")
-async def admit_student(
+def admit_student(
     data: AdmissionPayload,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -32,7 +42,7 @@ async def admit_student(
     return {"status": "success", "message": "Student added to institution"}
 
 @router.delete("/delete_student/{student_id}")
-async def delete_student(
+def delete_student(
         student_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -51,7 +61,7 @@ async def delete_student(
     return {"status": "success", "message": "Student removed"}
 
 @router.put("/edit_student/{student_id}")
-async def edit_student(
+def edit_student(
         student_id: int,
         data: Student_update,
         db: Session = Depends(get_db),
@@ -75,7 +85,7 @@ async def edit_student(
     return {"status": "success", "message": "Update successful"}
 
 @router.patch("/rename_section")
-async def rename_section(
+def rename_section(
         old_name: str,
         new_name: str,
         db: Session = Depends(get_db),
@@ -87,39 +97,152 @@ async def rename_section(
         student.institution_id == current_user.institution_id
     ).update({"section": new_name})
 
+    # Bulk UPDATE skips the mapper events: flag the caches and shards by hand
+    mark_rosters_stale(db, current_user.institution_id, old_name, new_name)
+    queue_reindex(db, current_user.institution_id, old_name, new_name)
     db.commit()
     return {"message": "Section renamed successfully"}
 
+# 🏛️ Admin grid paging: keyset cursors, so page 50 costs the same as page 1
+MY_STUDENTS_MAX_PAGE = int(os.getenv("MY_STUDENTS_MAX_PAGE", "500"))
+STUDENT_SORTS = {"id": student.id, "name": student.name}
+_student_fields = None
+
+def student_fields():
+    """
+    Column names ?fields= may ask for. Built on first use: inspect() configures
+    every mapper, which would cost a few hundred ms at import time.
+    """
+    global _student_fields
+    if _student_fields is None:
+        _student_fields = {a.key for a in inspect(student).column_attrs}
+    return _student_fields
+
+def encode_cursor(row, sort):
+    """Opaque 'after this row' marker: the sort value + id tie-breaker."""
+    return base64.urlsafe_b64encode(dumps([row[sort], row["id"]])).decode("ascii")
+
+def decode_cursor(cursor):
+    try:
+        value, last_id = loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return value, int(last_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_fields(fields, sort):
+    if not fields:
+        return None
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - student_fields()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return wanted | {"id", sort}  # the cursor needs both
+
+def active_student_filters(current_user, section):
+    criteria = [student.institution_id == current_user.institution_id, student.is_active == True]
+    if section:
+        criteria.append(student.section == section)
+    return criteria
+
 @router.get("/my_students")
-async def get_students(
-    db: Session = Depends(get_db), 
+def get_students(
+    limit: Optional[int] = Query(None, ge=1, le=MY_STUDENTS_MAX_PAGE),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "name"] = "id",
+    fields: Optional[str] = None,
+    section: Optional[str] = None,
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    students = db.query(student).filter(
-        student.institution_id == current_user.institution_id,
-        student.is_active == True
-    ).all()
+    """
+    Active students of the institution.
+    1. No `limit`: the whole list in one go (what the app always got).
+    2. `limit` (+ `cursor` from the previous page): one page, keyset-paged
+       by id or name, with `next_cursor` while more rows remain.
+    3. `fields=name,section,...` trims each row; `section=` narrows the list.
+    `count` is the total, computed on the first page only (indexed COUNT).
+    Read from the primary, not the replica: a student admitted a moment ago
+    must already be on the list the app reloads right after.
+    """
+    criteria = active_student_filters(current_user, section)
+    sort_col = STUDENT_SORTS[sort]
+    columns = parse_fields(fields, sort)
+
+    total = None
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        criteria.append(tuple_(sort_col, student.id) > (value, last_id))
+    elif limit is not None:
+        total = db.query(func.count(student.id)).filter(*criteria).scalar()
+
+    # Column-only rows + FastJSONResponse: no ORM objects, no jsonable_encoder pass
+    # (one extra row tells us whether there is a next page)
+    students = column_rows(
+        db, student, *criteria,
+        order_by=[sort_col, student.id], columns=columns,
+        limit=limit + 1 if limit is not None else None
+    )
 
-    return {
-        "count": len(students),
-        "students": students
-    }
+    next_cursor = None
+    if limit is not None and len(students) > limit:
+        students = students[:limit]
+        next_cursor = encode_cursor(students[-1], sort)
+    if limit is None:
+        total = len(students)
+
+    return FastJSONResponse({
+        "count": total,
+        "students": students,
+        "next_cursor": next_cursor
+    })
+
+@router.get("/my_students/count")
+def count_students(
+    section: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Primary, like /my_students (read-your-writes after an admission)
+    # Index-only COUNT (ix_students_inst_active_*): no rows leave the database
+    total = db.query(func.count(student.id)).filter(*active_student_filters(current_user, section)).scalar()
+    return {"count": total}
+
+def cached_roster(request, key, build):
+    """
+    Serves a roster_cache entry, building it on a miss:
+    1. The version is read before the query, so a write landing mid-read
+       stops the (now stale) result from being cached.
+    2. ETag + If-None-Match: a screen that re-opens an unchanged class gets a 304.
+    """
+    hit = roster_cache.get(key)
+    if hit is None:
+        version = roster_cache.version(key)
+        hit = roster_cache.put(key, version, dumps(build()))
+    etag, body = hit
+
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/sections")
-async def get_unique_sections(
+def get_unique_sections(
+        request: Request,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
     # This query gets distinct section names for the logged-in user's institution
-    sections = db.query(student.section).filter(
-        student.institution_id == current_user.institution_id,
-        student.is_active == True
-    ).distinct().all()
+    def build():
+        sections = db.query(student.section).filter(
+            student.institution_id == current_user.institution_id,
+            student.is_active == True
+        ).distinct().all()
+        return sorted(s[0] for s in sections if s[0]) # Returns a simple list of strings
 
-    return [s[0] for s in sections] # Returns a simple list of strings
+    return cached_roster(request, (current_user.institution_id, SECTIONS), build)
 
 @router.post("/hire-teacher")
-async def hire_teacher(
+def hire_teacher(
         data: TeacherCreate,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -149,7 +272,7 @@ async def hire_teacher(
     }
 
 @router.get("/teacher-list", response_model=TeacherListResponse) # Fixed Schema
-async def get_teacher_list(
+def get_teacher_list(
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
 ):
@@ -179,7 +302,7 @@ async def get_teacher_list(
 
 # 1. DELETE Teacher
 @router.delete("/teacher/{teacher_id}")
-async def delete_teacher(
+def delete_teacher(
         teacher_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -198,7 +321,7 @@ async def delete_teacher(
     return {"status": "success", "message": "Teacher removed"}
 
 @router.patch("/teacher/{teacher_id}")
-async def update_teacher(
+def update_teacher(
         teacher_id: int,
         data: EmployeeUpdate, # Ensure your schema includes designation
         db: Session = Depends(get_db),
@@ -301,7 +424,7 @@ def remove_staff(
 
 
 @router.get("/check-ownership")
-async def check_ownership(
+def check_ownership(
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -353,65 +476,141 @@ async def check_ownership(
         "full_name": current_user.user_name
     }
 
+# What the attendance / marksheet grids actually render
+ROSTER_FIELDS = {"id", "name", "father_name"}
+
 @router.get("/students/{section_name}")
-async def get_students_by_section(
+def get_students_by_section(
         section_name: str,
+        request: Request,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
     """
     🏛️ SUPER CONSOLE FETCH:
     Returns all active students for a specific section within the user's institution.
+    Served from roster_cache; admissions, edits, deletes and renames invalidate it.
     """
     # 1. Filter by Institution ID (Security & Truth)
     # 2. Filter by Section Name
     # 3. Ensure only Active students are fetched
-    students = db.query(student).filter(
-        student.institution_id == current_user.institution_id,
-        student.section == section_name,
-        student.is_active == True
-    ).order_by(student.name.asc()).all()
-
-    if not students:
-        # We return an empty list instead of an error to keep the frontend Grid stable
-        return []
-
-    return students
+    # An empty section is an empty list (not an error) to keep the frontend Grid stable
+    def build():
+        return column_rows(
+            db, student,
+            student.institution_id == current_user.institution_id,
+            student.section == section_name,
+            student.is_active == True,
+            order_by=[student.name.asc(), student.id.asc()],
+            columns=ROSTER_FIELDS,
+        )
 
-# Add to backend/routers/dashboard.py
+    return cached_roster(request, (current_user.institution_id, section_name), build)
 
 @router.post("/bulk-admit-students")
-async def bulk_admit_students(
-        students_list: list[AdmissionPayload],
+def bulk_admit_students(
+        students_list: list[dict[str, Any]] = Body(...),
+        skip_invalid: bool = False,
+        background: bool = False,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
+    """
+    🏛️ Set-based bulk admission (see backend/admissions.py):
+    rows are validated here (not by FastAPI) so one bad line is reported by
+    number instead of 422-ing the whole sheet.
+    - default: all-or-nothing, any bad row -> 422 with the per-row errors
+    - ?skip_invalid=true: saves the good rows, reports the rest
+    - ?background=true: 202 + job_id right away, poll GET /jobs/{job_id}
+    """
+    # Check if list is empty to save processing
+    if not students_list:
+        return {"status": "info", "message": "No students provided"}
+    if len(students_list) > BULK_ADMIT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_ADMIT_MAX_ROWS} students per request")
+
+    if background:
+        return queue_job(db, current_user, "bulk_admit", params={"skip_invalid": skip_invalid},
+                         payload=dumps(students_list), total=len(students_list))
+
     try:
-        # Check if list is empty to save processing
-        if not students_list:
-            return {"status": "info", "message": "No students provided"}
-
-        new_students = []
-        for data in students_list:
-            # Using data.dict() to convert the Pydantic model to a dictionary
-            student_obj = student(
-                **data.dict(),
-                institution_id=current_user.institution_id,
-                admitted_by=current_user.user_email,
-                is_active=True,
-                created_at=datetime.utcnow() # This now works with the import!
-            )
-            new_students.append(student_obj)
-
-        db.add_all(new_students)
+        report = bulk_admit(db, current_user.institution_id, current_user.user_email,
+                            students_list, strict=not skip_invalid)
+        summary = report.as_dict()
+        if report.failed and not skip_invalid:
+            db.rollback()
+            return FastJSONResponse(status_code=422, content={
+                "detail": f"{report.failed} row(s) have errors, nothing was saved (first: row {report.errors[0]['row']}: {report.errors[0]['error']})",
+                **summary,
+            })
         db.commit()
-
-        return {
-            "status": "success",
-            "message": f"Extraordinary! {len(new_students)} students registered successfully."
-        }
     except Exception as e:
         db.rollback()
         import traceback
         print(traceback.format_exc()) # This helps you see exactly why it failed in Render logs
-        raise HTTPException(status_code=500, detail=f"Bulk Save Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Bulk Save Error: {str(e)}")
+
+    print(f"🏛️ Bulk admit: {report.inserted} rows into {len(report.sections)} section(s) in {summary['elapsed_ms']:.0f} ms")
+    message = f"Extraordinary! {report.inserted} students registered successfully."
+    if report.failed:
+        message += f" {report.failed} row(s) skipped."
+    return {"status": "success" if not report.failed else "partial", "message": message, **summary}
+
+@router.post("/import-students")
+def import_students(
+        file: UploadFile = File(...),
+        mapping: Optional[str] = Form(None),
+        default_section: Optional[str] = Form(None),
+        default_fee: Optional[float] = Form(None),
+        background: bool = Form(False),
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    🏛️ SPREADSHEET ADMISSION: upload the CSV/XLSX as-is instead of building a
+    giant JSON array on the phone.
+    - mapping: optional JSON {"Sheet header": "name" | "father_name" | "section" | "fee" | "extra_fields"}
+    - default_section / default_fee: for sheets without that column (one class per file)
+    - background: 202 + job_id right away, poll GET /jobs/{job_id} (retry resumes after the last saved row)
+    Batches are committed as they go; bad rows come back by sheet row number.
+    """
+    if file.size is not None and file.size > ROSTER_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large (max {ROSTER_IMPORT_MAX_BYTES // (1024 * 1024)} MB)")
+    try:
+        column_map = loads(mapping) if mapping else None
+    except Exception:
+        raise HTTPException(status_code=400, detail="mapping must be a JSON object")
+    if column_map is not None and not isinstance(column_map, dict):
+        raise HTTPException(status_code=400, detail="mapping must be a JSON object")
+
+    defaults = {"section": default_section, "fee": default_fee}
+    if background:
+        try:
+            reader_for(file.filename)
+        except RosterImportError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        content = file.file.read(ROSTER_IMPORT_MAX_BYTES + 1)
+        if len(content) > ROSTER_IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"File too large (max {ROSTER_IMPORT_MAX_BYTES // (1024 * 1024)} MB)")
+        # The job keeps the file bytes until it succeeds: a failed import can be retried without re-uploading
+        return queue_job(db, current_user, "roster_import", payload=content,
+                         params={"filename": file.filename, "mapping": column_map, "defaults": defaults})
+
+    try:
+        # UploadFile is spooled to disk past 1 MB: the readers stream from there
+        report, columns = import_roster(
+            db, current_user.institution_id, current_user.user_email, file.file, file.filename,
+            mapping=column_map, defaults=defaults,
+        )
+    except RosterImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    message = f"Extraordinary! {report.inserted} students registered successfully."
+    if report.failed:
+        message += f" {report.failed} row(s) skipped."
+    return {
+        "status": "success" if not report.failed else "partial",
+        "message": message,
+        "columns": {str(k): v for k, v in columns.items()},
+        **report.as_dict(),
+    }
@@ -2,14 +2,18 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.models.admin.document import Syllabus, DateSheet, Notice, Voucher, AcademicResult, PaperVault, \
-    IndividualAttendance, AttendanceLog
+    IndividualAttendance, AttendanceLog, FinanceTemplate
 from backend.routers.auth import get_current_user, get_verified_inst
 from backend.database import get_db
+from backend.serialization import column_rows, FastJSONResponse, dumps, loads
+from backend.jobs import job_runner
+from backend.routers.jobs import queue_job
+from backend.billing import generate_vouchers, validate_heads, BillingError
 from backend.models.admin.institution import Institution
 from backend.models.User import User
 from backend.schemas.admin.document import VaultUpload, DateSheetResponse, DateSheetCreate, \
     NoticeCreate, NoticeResponse, BulkDeployPayload, BulkResultPayload, PaperCreate, AttendanceSubmit, \
-    StaffAttendanceSubmit , PendingSync
+    StaffAttendanceSubmit , PendingSync, FinanceTemplateCreate
 from typing import Optional
 from backend.models.admin.dashboard import student as StudentModel
 
@@ -19,7 +23,7 @@ router = APIRouter(
 )
 
 @router.post("/vault/upload")
-async def upload_to_vault(data: VaultUpload, db: Session = Depends(get_db), current_user: Any = Depends(get_current_user)):
+def upload_to_vault(data: VaultUpload, db: Session = Depends(get_db), current_user: Any = Depends(get_current_user)):
     # 🏛️ Check if this was a resumed draft we are now finalizing
     if data.id:
         existing = db.query(Syllabus).filter(
@@ -53,7 +57,7 @@ async def upload_to_vault(data: VaultUpload, db: Session = Depends(get_db), curr
     return {"status": "success", "id": new_doc.id}
 
 @router.delete("/pending/delete/{doc_id}")
-async def delete_pending_syllabus(
+def delete_pending_syllabus(
         doc_id: int,
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
@@ -109,7 +113,7 @@ def create_datesheet(
         )
 
 @router.post("/pending/sync")
-async def sync_pending_syllabus(
+def sync_pending_syllabus(
         data: PendingSync,
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
@@ -154,7 +158,7 @@ async def sync_pending_syllabus(
     return {"status": "created", "id": new_draft.id}
 
 @router.get("/pending/list")
-async def get_pending_syllabuses(
+def get_pending_syllabuses(
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
 ):
@@ -196,9 +200,31 @@ def publish_notice(
         print(f"DATABASE ERROR (Notice): {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to save notice.")
 
+def build_vouchers(institution_id, created_by, payload: BulkDeployPayload):
+    vouchers = []
+    for draft in payload.vouchers:
+        # 🏛️ Server-side sum for security (never trust the frontend for totals)
+        total = sum(item.amount for item in draft.heads)
+
+        vouchers.append(Voucher(
+            institution_ref=institution_id,
+            recipient_type=payload.mode,
+            name=draft.name,
+            registration_id=draft.id,
+            father_name=draft.parent,
+            phone=draft.phone,
+            billing_period=payload.billing_period,
+            particulars=[h.model_dump() for h in draft.heads],
+            total_amount=total,
+            # 🏛️ FIX: Changed .email to .user_email
+            created_by=created_by
+        ))
+    return vouchers
+
 @router.post("/finance/deploy-bulk")
-async def deploy_vouchers(
+def deploy_vouchers(
         payload: BulkDeployPayload,
+        background: bool = False,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
@@ -208,27 +234,12 @@ async def deploy_vouchers(
     if not payload.vouchers:
         raise HTTPException(status_code=400, detail="No vouchers provided in payload")
 
-    vouchers_to_save = []
+    if background:
+        return queue_job(db, current_user, "deploy_vouchers",
+                         payload=dumps(payload.model_dump()), total=len(payload.vouchers))
 
     try:
-        for draft in payload.vouchers:
-            # 🏛️ Server-side sum for security (never trust the frontend for totals)
-            total = sum(item.amount for item in draft.heads)
-
-            new_v = Voucher(
-                institution_ref=current_user.institution_id,
-                recipient_type=payload.mode,
-                name=draft.name,
-                registration_id=draft.id,
-                father_name=draft.parent,
-                phone=draft.phone,
-                billing_period=payload.billing_period,
-                particulars=[h.model_dump() for h in draft.heads],
-                total_amount=total,
-                # 🏛️ FIX: Changed .email to .user_email
-                created_by=current_user.user_email
-            )
-            vouchers_to_save.append(new_v)
+        vouchers_to_save = build_vouchers(current_user.institution_id, current_user.user_email, payload)
 
         # 🏛️ Efficient Bulk insert
         db.add_all(vouchers_to_save)
@@ -246,37 +257,129 @@ async def deploy_vouchers(
         print(f"FINANCE DEPLOY ERROR: {str(e)}")
         raise HTTPException(status_code=500, detail="Database integrity failure during bulk deploy")
 
+@job_runner.register("deploy_vouchers")
+def run_deploy_vouchers_job(db, job, progress):
+    payload = BulkDeployPayload.model_validate(loads(job.payload))
+    vouchers = build_vouchers(job.institution_id, job.created_by, payload)
+    db.add_all(vouchers)
+    db.commit()
+    progress(len(vouchers), len(vouchers))
+    return {"status": "success", "count": len(vouchers),
+            "message": f"Successfully deployed {len(vouchers)} vouchers to {payload.billing_period}"}
+
+# 🏛️ BILLING ENGINE: save the charge structure once, generate a month of vouchers in one call
+@router.post("/finance/templates")
+def create_finance_template(
+        data: FinanceTemplateCreate,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    heads = [h.model_dump() for h in data.heads]
+    try:
+        validate_heads(heads, data.mode)
+    except BillingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    template = FinanceTemplate(
+        institution_id=current_user.institution_id,
+        target_group=data.target_group,
+        billing_month=data.billing_month,
+        mode=data.mode,
+        structure=heads,
+        # Fixed charges only: per-student fees are added when the vouchers are generated
+        total_amount=sum(h["amount"] for h in heads if not h.get("source")),
+        issue_date=data.issue_date,
+        due_date=data.due_date,
+    )
+    db.add(template)
+    db.commit()
+    return {"status": "success", "id": template.id, "total_amount": template.total_amount}
+
+@router.get("/finance/templates")
+def list_finance_templates(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    rows = column_rows(db, FinanceTemplate, FinanceTemplate.institution_id == current_user.institution_id,
+                       order_by=[FinanceTemplate.created_at.desc()])
+    return FastJSONResponse(content=rows)
+
+@router.post("/finance/templates/{template_id}/generate")
+def generate_template_vouchers(
+        template_id: int,
+        billing_period: Optional[str] = None,
+        background: bool = False,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Expands the template over its target group (a section, all students, or staff)
+    for one billing period (default: the template's month). Safe to call again:
+    recipients who already have this template's voucher for the period are skipped.
+    """
+    template = db.query(FinanceTemplate).filter(
+        FinanceTemplate.id == template_id,
+        FinanceTemplate.institution_id == current_user.institution_id
+    ).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    if background:
+        return queue_job(db, current_user, "generate_vouchers",
+                         params={"template_id": template.id, "billing_period": billing_period})
+    try:
+        summary = generate_vouchers(db, template, billing_period, current_user.user_email)
+    except BillingError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        print(f"FINANCE DEPLOY ERROR: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database integrity failure during voucher generation")
+    return {
+        "status": "success",
+        "message": f"Successfully deployed {summary['created']} vouchers to {summary['billing_period']}",
+        **summary,
+    }
+
+def build_results(institution_id, created_by, payload: BulkResultPayload):
+    # 🏛️ INSTITUTION CONSOLE LOGIC:
+    # Loop through each student in the payload and create a separate DB row
+    records = []
+    for entry in payload.results:
+        # Entry matches the 'ResultEntry' schema (name, father_name, marks)
+
+        # Calculate percentage for the 'percentage' column
+        obt = entry.marks[0].obt if entry.marks else 0
+        total = entry.marks[0].max if entry.marks else 100
+        calc_percentage = (obt / total) * 100 if total > 0 else 0
+
+        records.append(AcademicResult(
+            institution_id=institution_id,
+            exam_title=payload.exam_title,
+            target_class=payload.class_name,    # 🎯 Matches your Column 'target_class'
+            student_name=entry.name,            # 🎯 Matches your Column 'student_name'
+            father_name=entry.father_name,      # 🎯 Matches your Column 'father_name'
+            marks_data=entry.marks[0].model_dump(), # Single subject data
+            percentage=calc_percentage,
+            status="published" if not payload.is_draft else "pending",
+            created_by=created_by
+        ))
+    return records
+
 # Inside your router in document.py
 @router.post("/academic/deploy-results")
-async def deploy_results(
+def deploy_results(
         payload: BulkResultPayload,
+        background: bool = False,
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
 ):
+    if background:
+        return queue_job(db, current_user, "deploy_results",
+                         payload=dumps(payload.model_dump()), total=len(payload.results))
     try:
-        # 🏛️ INSTITUTION CONSOLE LOGIC:
-        # Loop through each student in the payload and create a separate DB row
-        for entry in payload.results:
-            # Entry matches the 'ResultEntry' schema (name, father_name, marks)
-
-            # Calculate percentage for the 'percentage' column
-            obt = entry.marks[0].obt if entry.marks else 0
-            total = entry.marks[0].max if entry.marks else 100
-            calc_percentage = (obt / total) * 100 if total > 0 else 0
-
-            new_record = AcademicResult(
-                institution_id=current_user.institution_id,
-                exam_title=payload.exam_title,
-                target_class=payload.class_name,    # 🎯 Matches your Column 'target_class'
-                student_name=entry.name,            # 🎯 Matches your Column 'student_name'
-                father_name=entry.father_name,      # 🎯 Matches your Column 'father_name'
-                marks_data=entry.marks[0].model_dump(), # Single subject data
-                percentage=calc_percentage,
-                status="published" if not payload.is_draft else "pending",
-                created_by=current_user.user_email
-            )
-            db.add(new_record)
-
+        db.add_all(build_results(current_user.institution_id, current_user.user_email, payload))
         db.commit()
         return {"status": "success", "message": f"{len(payload.results)} records deployed."}
 
@@ -285,21 +388,31 @@ async def deploy_results(
         print(f"DEPLOY ERROR: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@job_runner.register("deploy_results")
+def run_deploy_results_job(db, job, progress):
+    payload = BulkResultPayload.model_validate(loads(job.payload))
+    db.add_all(build_results(job.institution_id, job.created_by, payload))
+    db.commit()
+    progress(len(payload.results), len(payload.results))
+    return {"status": "success", "message": f"{len(payload.results)} records deployed."}
+
 @router.get("/pending-marksheets")
-async def get_pending_marksheets(
+def get_pending_marksheets(
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
 ):
     # Single bulk fetch: Source of Truth (Institution) + State (Pending)
-    marksheets = db.query(AcademicResult).filter(
+    marksheets = column_rows(
+        db, AcademicResult,
         AcademicResult.institution_id == current_user.institution_id,
-        AcademicResult.status == "pending"  # Only fetch what needs action
-    ).order_by(AcademicResult.created_at.desc()).all()
+        AcademicResult.status == "pending",  # Only fetch what needs action
+        order_by=[AcademicResult.created_at.desc()]
+    )
 
-    return marksheets
+    return FastJSONResponse(marksheets)
 
 @router.patch("/academic/finalize-results")
-async def finalize_results(
+def finalize_results(
         exam_title: str,
         class_name: str,
         db: Session = Depends(get_db),
@@ -325,7 +438,7 @@ async def finalize_results(
     return {"status": "success", "message": "Marked as Completed"}
 
 @router.post("/papers/save-vault")
-async def save_to_vault(
+def save_to_vault(
         payload: PaperCreate,
         paper_id: Optional[int] = None, # FastAPI will pick this from URL ?paper_id=...
         db: Session = Depends(get_db),
@@ -370,7 +483,7 @@ async def save_to_vault(
 
 
 @router.get("/papers/vault-list")
-async def get_vault_papers(
+def get_vault_papers(
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
@@ -387,7 +500,7 @@ async def get_vault_papers(
     return papers
 
 @router.put("/papers/mark-taken/{paper_id}")
-async def mark_paper_as_taken(
+def mark_paper_as_taken(
         paper_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -406,7 +519,7 @@ async def mark_paper_as_taken(
     return {"status": "success", "message": "Paper marked as taken"}
 
 @router.delete("/papers/delete/{paper_id}")
-async def delete_paper(
+def delete_paper(
         paper_id: int,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -429,7 +542,7 @@ async def delete_paper(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/submit")
-async def submit_attendance(
+def submit_attendance(
         payload: AttendanceSubmit,
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
@@ -467,7 +580,7 @@ async def submit_attendance(
         raise HTTPException(status_code=500, detail="Failed to save institutional record")
 
 @router.post("/submit-staff")
-async def submit_staff_attendance(payload: StaffAttendanceSubmit, db: Session = Depends(get_db), current_user: Any = Depends(get_current_user)):
+def submit_staff_attendance(payload: StaffAttendanceSubmit, db: Session = Depends(get_db), current_user: Any = Depends(get_current_user)):
     # Corrected: model uses institution_id
     new_log = AttendanceLog(
         institution_id=current_user.institution_id,
@@ -16,7 +16,7 @@ router = APIRouter(
 # backend/routers/institution.py
 
 @router.post("/initialize-role")
-async def initialize_user_role(
+def initialize_user_role(
         payload: RoleUpdate,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -47,7 +47,7 @@ async def initialize_user_role(
     return {"status": "success", "role": new_role_type}
 
 @router.patch("/update-role")
-async def update_user_role(
+def update_user_role(
         payload: RoleUpdate,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -97,7 +97,7 @@ def generate_join_key():
     return f"{''.join(random.choices(chars, k=3))}-{''.join(random.choices(chars, k=3))}"
 
 @router.post("/setup-workspace")
-async def setup_workspace(
+def setup_workspace(
         payload: dict = Body(...),
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -162,7 +162,7 @@ async def setup_workspace(
         raise HTTPException(status_code=500, detail="Failed to create institution")
 
 @router.get("/sync-state")
-async def get_sync_state(
+def get_sync_state(
         background_tasks: BackgroundTasks,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -192,7 +192,7 @@ async def get_sync_state(
     }
 
 @router.get("/verify-setup-eligibility")
-async def verify_setup_eligibility(
+def verify_setup_eligibility(
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
 ):
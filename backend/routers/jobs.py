@@ -0,0 +1,76 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend.serialization import FastJSONResponse
+from backend.routers.auth import get_current_user
+from backend.models.User import User
+from backend.models.job import BackgroundJob
+from backend.jobs import job_runner, JobQueueFull
+
+JOB_LIST_LIMIT = int(os.getenv("JOB_LIST_LIMIT", "50"))
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Background Jobs"]
+)
+
+
+def queue_job(db, current_user, kind, **job):
+    """For routers with a ?background=true mode: hands the work to backend.jobs, answers 202 + the id to poll."""
+    try:
+        queued = job_runner.submit(db, kind, current_user.institution_id, current_user.user_email, **job)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Too many jobs queued, try again shortly")
+    return FastJSONResponse(status_code=202, content={
+        "status": "queued", "job_id": queued.id, "poll": f"/jobs/{queued.id}",
+        "message": "Started in the background, you can leave this page",
+    })
+
+
+def get_job_or_404(db, job_id, current_user):
+    # Tenant check in the query: someone else's job id is a plain 404
+    job = db.query(BackgroundJob).filter(
+        BackgroundJob.id == job_id,
+        BackgroundJob.institution_id == current_user.institution_id
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}")
+def get_job(
+        job_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    """🏛️ Poll this after a 202: status, done/total progress, then the result or error."""
+    return job_runner.status(db, get_job_or_404(db, job_id, current_user))
+
+
+@router.get("")
+def list_jobs(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    jobs = db.query(BackgroundJob).filter(
+        BackgroundJob.institution_id == current_user.institution_id
+    ).order_by(BackgroundJob.created_at.desc()).limit(JOB_LIST_LIMIT).all()
+    return [job_runner.status(db, job) for job in jobs]
+
+
+@router.post("/{job_id}/retry", status_code=202)
+def retry_job(
+        job_id: str,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    job = get_job_or_404(db, job_id, current_user)
+    if job_runner.status(db, job)["status"] != "failed":
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    try:
+        job_runner.retry(db, job)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Too many jobs queued, try again shortly")
+    return {"job_id": job.id, "status": job.status}
@@ -13,7 +13,7 @@ router = APIRouter(
 )
 
 @router.post("/join")
-async def join_institution(
+def join_institution(
         payload: dict = Body(...),
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
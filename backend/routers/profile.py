@@ -62,7 +62,7 @@ def update_bio(
         raise HTTPException(status_code=500, detail="Could not save to database")
 
 @router.get("/me", response_model=ProfileOut)
-async def get_my_profile(
+def get_my_profile(
         current_user: User = Depends(auth.get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -74,7 +74,7 @@ async def get_my_profile(
 
 # 🏛️ POST: Update/Create My Profile (Private)
 @router.post("/update")
-async def update_profile(
+def update_profile(
         data: ProfileUpdate,
         current_user: User = Depends(auth.get_current_user),
         db: Session = Depends(get_db)
@@ -103,7 +103,7 @@ def get_all_profiles(db: Session = Depends(get_db)):
     return profiles
 
 @router.post("/create", response_model=AuthIdResponse)
-async def create_identity(
+def create_identity(
         payload: AuthIdCreate,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -151,7 +151,7 @@ async def create_identity(
 
 
 @router.post("/user/upload-pfp")
-async def update_pfp(
+def update_pfp(
         payload: PFPUpdate,
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
@@ -10,7 +10,7 @@ from backend.routers.__init__ import send_push_to_user  # Import your FCM functi
 router = APIRouter(prefix="/ready", tags=["Institution creation"])
 
 @router.get("/check-essentials")
-async def check_essentials(
+def check_essentials(
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
 ):
@@ -47,7 +47,7 @@ import secrets
 import string
 
 @router.post("/create-school", status_code=status.HTTP_201_CREATED)
-async def create_school(
+def create_school(
         payload: SchoolSchema,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -104,7 +104,7 @@ async def create_school(
         raise HTTPException(status_code=500, detail="Institutional keys collision. Please try again.")
 
 @router.post("/create-academy", status_code=status.HTTP_201_CREATED)
-async def create_academy(
+def create_academy(
         payload: AcademySchema,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -145,7 +145,7 @@ async def create_academy(
     }
 
 @router.post("/create-college", status_code=status.HTTP_201_CREATED)
-async def create_college(
+def create_college(
         payload: CollegeSchema,
         db: Session = Depends(database.get_db),
         current_user: User = Depends(get_current_user)
@@ -1,37 +1,31 @@
-import os
 import json
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from google import genai
-from google.genai import types
 from sqlalchemy.orm import Session
 from typing import Any
 
 # Internal Imports
 from .auth import get_current_user
 from backend.database import get_db
+from backend.genai_client import get_genai
 from backend.models.admin.document import ScannedQuestionBank
 from backend.schemas.admin.document import ScannedBankResponse, ScannedBankCreate
-from google.genai.types import HttpOptions
 
 router = APIRouter(prefix="/scanner", tags=["Scanner Management"])
 
-# Initialize client - Gemini 3 Flash is accessed via the latest SDK
-client = genai.Client(
-    api_key=os.environ.get("GOOGLE_AI_KEY"),
-    http_options=HttpOptions(api_version="v1beta")
-)
+# Gemini client + types come from backend.genai_client, imported on first scan
 
 # In backend/routers/scanner.py
 # In backend/routers/scanner.py
 
 @router.post("/papers/scan-only")
-async def scan_only(
+def scan_only(
         file: UploadFile = File(...),
         current_user: Any = Depends(get_current_user)
 ):
     try:
-        content = await file.read()
+        content = file.file.read()
+        client, types = get_genai()
 
         # 1. DEFINE THE CONFIG FIRST (Fixes the NameError)
         generate_content_config = types.GenerateContentConfig(
@@ -87,7 +81,7 @@ async def scan_only(
         )
 
 @router.post("/papers/save-scanned", response_model=ScannedBankResponse)
-async def save_scanned_to_vault(
+def save_scanned_to_vault(
         payload: ScannedBankCreate,
         db: Session = Depends(get_db),
         current_user: Any = Depends(get_current_user)
@@ -115,12 +109,13 @@ async def save_scanned_to_vault(
 
 
 @router.post("/admission/scan-register")
-async def scan_admission_register(
+def scan_admission_register(
         file: UploadFile = File(...),
         current_user: Any = Depends(get_current_user)
 ):
     try:
-        content = await file.read()
+        content = file.file.read()
+        client, types = get_genai()
 
         # 1. Define the "Soft" Configuration for maximum flexibility
         admission_config = types.GenerateContentConfig(
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from backend.database import get_db
+from backend.database import get_read_db
 from backend.models.user import User
 from backend.models.admin.institution import Institution, Owner
 from typing import Optional
@@ -9,9 +9,9 @@ from typing import Optional
 router = APIRouter(prefix="/explore", tags=["explore"])
 
 @router.get("/users")
-async def get_all_users(
+def get_all_users(
         query: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     # Filter out users who haven't finished verification
     base_query = db.query(User).filter(User.type != "verified_user")
@@ -36,9 +36,9 @@ async def get_all_users(
     ]
 
 @router.get("/institutions")
-async def get_all_institutions(
+def get_all_institutions(
         query: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     # Join with owner to show who created it
     base_query = db.query(Institution, Owner).join(Owner)
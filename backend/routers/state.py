@@ -1,120 +1,358 @@
+import gzip
 import json
-import secrets
+import hashlib
+import hmac
 import datetime
-import asyncio
 import threading
+from contextlib import contextmanager
+from collections import defaultdict
 from sqlalchemy import event, inspect
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from backend.database import get_db, SessionLocal
-from backend.models.state import InstitutionState
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from backend.database import get_db, SessionLocal, ReadSessionLocal, replica_monitor
+from backend.scuirity import SECRET_KEY
+from backend.serialization import column_rows, dumps_str
+from backend.scheduler import DebouncedScheduler
+from backend.sync_hub import sync_hub
+from backend.models.state import InstitutionState, InstitutionShard
 # Import your specific institution models
 from backend.models.admin.dashboard import student as StudentModel, Staff
 from backend.models.admin.document import AttendanceLog, AcademicResult
 
+try:
+    import brotli  # optional: shards are served gzip-only without it
+except ImportError:
+    brotli = None
+
 router = APIRouter(prefix="/state", tags=["Institutional Intelligence"])
 
-# Tracker for real-time WebSocket pushing
-active_connections = {}
+# SQLite ignores FOR UPDATE: there a fixed set of in-process locks (picked by
+# institution id, so it never grows) stands in for the state row lock
+REGISTRY_LOCK_STRIPES = [threading.RLock() for _ in range(64)]
+
+def extract_section_shard(db: Session, inst_id: int, sec_name: str):
+    """Builds the payload of a single class shard straight from the DB."""
+    return {
+        "students": column_rows(db, StudentModel, StudentModel.institution_id == inst_id, StudentModel.section == sec_name),
+        "results": column_rows(db, AcademicResult, AcademicResult.institution_id == inst_id, AcademicResult.target_class == sec_name),
+        "attendance": column_rows(db, AttendanceLog, AttendanceLog.institution_id == inst_id, AttendanceLog.section_identifier == sec_name)
+    }
+
+def extract_personal_state(db: Session, inst_id: int):
+    """Builds the Staff/Teachers shard."""
+    return {"staff": column_rows(db, Staff, Staff.institution_id == inst_id)}
+
+def serialize_shard(payload):
+    return dumps_str(payload)
+
+def encode_shard(row: InstitutionShard):
+    """Hashes and pre-compresses the payload once per change, not once per request."""
+    raw = row.payload.encode("utf-8")
+    row.etag = hashlib.sha256(raw).hexdigest()
+    row.payload_gzip = gzip.compress(raw, compresslevel=6, mtime=0)
+    row.payload_br = brotli.compress(raw) if brotli else None
+
+def shard_key(inst_id: int, shard_name: str, body: str):
+    """
+    Content-addressed key: the same shard content always yields the same key,
+    so a no-op edit leaves clients' cached copy valid. Keyed with SECRET_KEY
+    because the key doubles as the shard's access token.
+    """
+    message = f"{inst_id}:{shard_name}:".encode("utf-8") + body.encode("utf-8")
+    return hmac.new(SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()[:32]
+
+def store_shard(db: Session, inst_id: int, shard_name: str, payload, key: str = None):
+    """
+    Upserts one InstitutionShard row; the row is left alone when the content is unchanged.
+    `key` overrides the content-derived key (legacy migration keeps the key clients hold).
+    """
+    body = serialize_shard(payload)
+    key = key or shard_key(inst_id, shard_name, body)
+    query = db.query(InstitutionShard).filter_by(institution_id=inst_id, shard_name=shard_name)
+    row = query.first()
+    if not row:
+        row = InstitutionShard(institution_id=inst_id, shard_name=shard_name, payload=body, key=key, version=1)
+        encode_shard(row)
+        try:
+            with db.begin_nested():
+                db.add(row)
+            return row
+        except IntegrityError:
+            # Another writer inserted it first (uq_inst_shard): update theirs instead
+            row = query.first()
+    if row.key != key:
+        row.payload = body
+        row.key = key
+        row.version += 1
+        row.updated_at = datetime.datetime.utcnow()
+        encode_shard(row)
+    return row
+
+def register_shard(shards: dict, shard_name: str, row: InstitutionShard):
+    """Points the registry entry at the row; an unchanged entry keeps its 'rev'."""
+    info = shards.get(shard_name)
+    if info and info.get("mode") == "update" and info.get("key") == row.key:
+        info["version"] = row.version
+    else:
+        shards[shard_name] = {"key": row.key, "mode": "update", "version": row.version}
+
+def drop_shard(db: Session, inst_id: int, shard_name: str):
+    db.query(InstitutionShard).filter_by(
+        institution_id=inst_id, shard_name=shard_name
+    ).delete(synchronize_session=False)
+
+@contextmanager
+def registry_lock(db: Session, inst_id: int):
+    """
+    Wraps a registry rebuild up to its commit. Postgres serializes through
+    lock_state's row lock; dialects without row locks (SQLite) take the
+    institution's in-process stripe for the whole rebuild instead.
+    """
+    if db.bind.dialect.name != "sqlite":
+        yield
+        return
+    with REGISTRY_LOCK_STRIPES[inst_id % len(REGISTRY_LOCK_STRIPES)]:
+        yield
+
+def lock_state(db: Session, inst_id: int, create: bool = False):
+    """
+    SELECT ... FOR UPDATE on the institution's state row: one registry
+    read-modify-write at a time across every worker and host, released by
+    the commit/rollback. create=True inserts the row first when missing.
+    """
+    query = db.query(InstitutionState).filter_by(institution_id=inst_id).with_for_update().populate_existing()
+    state_rec = query.first()
+    if state_rec or not create:
+        return state_rec
+    try:
+        db.add(InstitutionState(institution_id=inst_id, key_registry='{"shards": {}}', full_data_blob='{}'))
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another worker created it first
+    return query.first()
 
-def object_as_dict(obj):
+def migrate_legacy_blob(db: Session, state_rec: InstitutionState, registry: dict):
     """
-    Enhanced Logic: Converts SQLAlchemy objects to dicts
-    and handles Date/Time serialization.
+    One-off: explodes a pre-shard full_data_blob into InstitutionShard rows.
+    Each shard keeps the key already in the registry: clients hold it and
+    nothing new is announced, so a fresh key would only earn them a 403.
     """
-    d = {}
-    for c in inspect(obj).mapper.column_attrs:
-        value = getattr(obj, c.key)
-        # Phenomenon: JSON Serialization Guard
-        if isinstance(value, (datetime.datetime, datetime.date)):
-            d[c.key] = value.isoformat()
-        else:
-            d[c.key] = value
-    return d
+    legacy = json.loads(state_rec.full_data_blob or "{}")
+    if not legacy:
+        return
+    shards = registry.get("shards", {})
+    pools = dict(legacy.get("sections", {}))
+    if "personal_state" in legacy:
+        pools["personal_state"] = legacy["personal_state"]
 
-def perform_targeted_extraction(db: Session, inst_id: int, target_section: str = None):
+    for name, payload in pools.items():
+        info = shards.get(name)
+        if info and info["mode"] != "delete":
+            row = store_shard(db, state_rec.institution_id, name, payload, key=info.get("key"))
+            register_shard(shards, name, row)
+    state_rec.full_data_blob = "{}"
+
+def shard_signatures(registry: dict):
+    return {n: (i.get("key"), i.get("mode")) for n, i in registry.get("shards", {}).items()}
+
+def stamp_registry(registry: dict, before: dict):
+    """Bumps the registry version once and tags every shard entry that changed with it ('rev')."""
+    changed = [n for n, sig in shard_signatures(registry).items() if before.get(n) != sig]
+    if changed:
+        registry["version"] = registry.get("version", 0) + 1
+        for n in changed:
+            registry["shards"][n]["rev"] = registry["version"]
+    return changed
+
+def registry_delta(registry: dict, since: int = None):
+    """
+    Sync message for a client holding registry version `since`:
+    only the shard entries changed after it, or the whole map when the
+    client has nothing usable (no/zero version, or one from the future).
+    """
+    version = registry.get("version", 0)
+    if not since or since > version:
+        return {"type": "full", "version": version, "shards": registry.get("shards", {})}
+    return {
+        "type": "delta",
+        "version": version,
+        "since": since,
+        "shards": {n: i for n, i in registry.get("shards", {}).items() if i.get("rev", 0) > since}
+    }
+
+def load_registry(db: Session, inst_id: int):
+    """Current registry straight from storage (None if never indexed)."""
+    raw = db.query(InstitutionState.key_registry).filter_by(institution_id=inst_id).scalar()
+    return json.loads(raw) if raw else None
+
+def perform_targeted_extraction(db: Session, inst_id: int, target_section: str = None, read_db: Session = None):
     """
     The Core Engine:
     1. Crawls DB for all data related to the institution.
     2. Shards data into logical sections (Classes/Staff).
     3. Updates the 'Registry' (the map of keys) in the DB.
+    Keys are content-derived, so only sections whose data changed get a new one
+    ('target_section' is kept for callers but no longer forces a rotation).
+    Source pools come from `read_db` (a caught-up replica) when given.
     """
-    # 1. Fetch Raw Data Pools
-    students = db.query(StudentModel).filter_by(institution_id=inst_id).all()
-    attendance = db.query(AttendanceLog).filter_by(institution_id=inst_id).all()
-    results = db.query(AcademicResult).filter_by(institution_id=inst_id).all()
-    staffs = db.query(Staff).filter_by(institution_id=inst_id).all()
-
-    # 2. Manage the InstitutionState Record (The Persistence Layer)
-    state_rec = db.query(InstitutionState).filter_by(institution_id=inst_id).first()
-    if not state_rec:
-        state_rec = InstitutionState(institution_id=inst_id, key_registry='{"shards": {}}', full_data_blob='{}')
-        db.add(state_rec)
-        db.commit()
-        db.refresh(state_rec)
+    # 1. Lock the InstitutionState Record (The Persistence Layer) before reading,
+    #    so a slower concurrent crawl can't overwrite newer shards with older data
+    state_rec = lock_state(db, inst_id, create=True)
+
+    # 2. Fetch Raw Data Pools (column-only, ordered by id => stable shard keys)
+    source = read_db or db
+    students = column_rows(source, StudentModel, StudentModel.institution_id == inst_id)
+    attendance = column_rows(source, AttendanceLog, AttendanceLog.institution_id == inst_id)
+    results = column_rows(source, AcademicResult, AcademicResult.institution_id == inst_id)
+    staffs = column_rows(source, Staff, Staff.institution_id == inst_id)
 
     current_registry = json.loads(state_rec.key_registry)
-    mass_data = {"sections": {}, "personal_state": {"staff": []}}
+    shards = current_registry["shards"]
+    before = shard_signatures(current_registry)
 
-    # 3. Identify Active Sections (Classes)
-    active_sections = set([s.section for s in students if s.section])
+    # 3. Identify Active Sections (Classes) + group every pool in a single pass
+    grouped = defaultdict(lambda: {"students": [], "results": [], "attendance": []})
+    for s in students:
+        if s["section"]: grouped[s["section"]]["students"].append(s)
+    active_sections = set(grouped)
+    for r in results:
+        if r["target_class"] in active_sections: grouped[r["target_class"]]["results"].append(r)
+    for l in attendance:
+        if l["section_identifier"] in active_sections: grouped[l["section_identifier"]]["attendance"].append(l)
 
     # 4. Handle Staff/Teachers (Personal State)
-    mass_data["personal_state"]["staff"] = [object_as_dict(st) for st in staffs]
-    if "personal_state" not in current_registry["shards"] or target_section == "personal_state":
-        current_registry["shards"]["personal_state"] = {"key": secrets.token_hex(16), "mode": "update"}
+    row = store_shard(db, inst_id, "personal_state", {"staff": staffs})
+    register_shard(shards, "personal_state", row)
 
     # 5. Section Sharding (The Loop)
     for sec_name in active_sections:
-        mass_data["sections"][sec_name] = {
-            "students": [object_as_dict(s) for s in students if s.section == sec_name],
-            "results": [object_as_dict(r) for r in results if r.target_class == sec_name],
-            "attendance": [object_as_dict(l) for l in attendance if l.section_identifier == sec_name]
-        }
-
-        # If it's new or was the target of a change, rotate the key
-        if sec_name not in current_registry["shards"] or sec_name == target_section:
-            current_registry["shards"][sec_name] = {"key": secrets.token_hex(16), "mode": "update"}
+        # The key only moves when the section's content actually changed
+        register_shard(shards, sec_name, store_shard(db, inst_id, sec_name, grouped[sec_name]))
 
     # 6. Cleanup Logic (DELETION MODE)
-    for registered_sec in list(current_registry["shards"].keys()):
+    for registered_sec in list(shards.keys()):
         if registered_sec != "personal_state" and registered_sec not in active_sections:
-            current_registry["shards"][registered_sec] = {"key": "NULL", "mode": "delete"}
+            if shards[registered_sec]["mode"] != "delete":
+                shards[registered_sec] = {"key": "NULL", "mode": "delete"}
+            drop_shard(db, inst_id, registered_sec)
+
+    # 7. Persistence (shard rows carry the payloads now)
+    stamp_registry(current_registry, before)
+    state_rec.key_registry = json.dumps(current_registry)
+    state_rec.full_data_blob = "{}"
+    state_rec.last_indexed = datetime.datetime.utcnow()
+    db.commit()
+
+    return current_registry
+
+def perform_incremental_extraction(db: Session, inst_id: int, target_section: str = None, read_db: Session = None):
+    """
+    Incremental Engine:
+    Rebuilds ONLY the touched shard (a class section or 'personal_state')
+    and writes that one shard row. Falls back to the full crawl
+    when there is no stored state yet or no target to narrow down to.
+    The state row stays locked until the final commit (see lock_state).
+    """
+    with registry_lock(db, inst_id):
+        state_rec = lock_state(db, inst_id)
+        if not state_rec or not target_section:
+            return perform_targeted_extraction(db, inst_id, target_section=target_section, read_db=read_db)
+        return splice_shard(db, state_rec, inst_id, target_section, read_db=read_db)
+
+def splice_shard(db: Session, state_rec: InstitutionState, inst_id: int, target_section: str, read_db: Session = None):
+    """Re-extracts one shard and writes it back into its row + the registry."""
+    current_registry = json.loads(state_rec.key_registry)
+    shards = current_registry.setdefault("shards", {})
+    before = shard_signatures(current_registry)
+    migrate_legacy_blob(db, state_rec, current_registry)
+
+    if target_section == "personal_state":
+        payload = extract_personal_state(read_db or db, inst_id)
+    else:
+        payload = extract_section_shard(read_db or db, inst_id, target_section)
 
-    # 7. Persistence
+    if target_section == "personal_state" or payload["students"]:
+        register_shard(shards, target_section, store_shard(db, inst_id, target_section, payload))
+    else:
+        # A section only lives as long as it has students (DELETION MODE)
+        drop_shard(db, inst_id, target_section)
+        if target_section in shards and shards[target_section]["mode"] != "delete":
+            shards[target_section] = {"key": "NULL", "mode": "delete"}
+
+    stamp_registry(current_registry, before)
     state_rec.key_registry = json.dumps(current_registry)
-    # Update this line in perform_targeted_extraction:
-    state_rec.full_data_blob = json.dumps(
-    mass_data,
-    default=lambda o: o.isoformat() if isinstance(o, (datetime.datetime, datetime.date)) else str(o)
-)
-    state_rec.last_updated = datetime.datetime.utcnow()
+    state_rec.last_indexed = datetime.datetime.utcnow()
     db.commit()
 
     return current_registry
 
 # --- REAL-TIME LISTENERS ---
 
+def affected_shards(target):
+    """Resolves which shard(s) a changed row belongs to (old + new section on a move)."""
+    if isinstance(target, Staff):
+        return ["personal_state"]
+
+    attr = "section"
+    if isinstance(target, AttendanceLog): attr = "section_identifier"
+    elif isinstance(target, AcademicResult): attr = "target_class"
+
+    names = [getattr(target, attr, None)]
+    # A student moved between sections also invalidates the section it left
+    names.extend(inspect(target).attrs[attr].history.deleted or [])
+    return [n for n in dict.fromkeys(names) if n]
+
+def run_reindex(key):
+    """Scheduler handler: one (institution, section) rebuild + WebSocket push."""
+    inst_id, section_name = key
+    db = SessionLocal()
+    # Extraction reads may use the replica, but only once it has replayed the
+    # commit that triggered this rebuild (LSN check), else a stale shard ships
+    read_db = ReadSessionLocal() if replica_monitor.caught_up_with(db) else None
+    try:
+        known = (load_registry(db, inst_id) or {}).get("version", 0)
+        new_reg = perform_incremental_extraction(db, inst_id, target_section=section_name, read_db=read_db)
+        delta = registry_delta(new_reg, known or None)
+        # Hand over to the event loop; the hub fans out only what changed
+        if delta["shards"]:
+            sync_hub.publish(inst_id, delta)
+    finally:
+        db.close()
+        if read_db is not None: read_db.close()
+
+# Bulk writes (e.g. 500 admissions) collapse into one rebuild per section
+reindex_scheduler = DebouncedScheduler(run_reindex)
+
 def trigger_reindex(mapper, connection, target):
-    """Listener: Detects DB changes and triggers a background sync."""
+    """Listener: Marks the touched shard(s) dirty on the session; dispatched on commit."""
     inst_id = getattr(target, 'institution_id', None)
     if not inst_id: return
 
-    def run_sync():
-        db = SessionLocal()
-        try:
-            section_name = getattr(target, 'section', None) or getattr(target, 'section_identifier', None)
-            new_reg = perform_targeted_extraction(db, inst_id, target_section=section_name)
-            # Push to WebSocket if active
-            if inst_id in active_connections:
-                loop = asyncio.new_event_loop()
-                for ws in active_connections[inst_id]:
-                    try: loop.run_until_complete(ws.send_json(new_reg))
-                    except: pass
-                loop.close()
-        finally: db.close()
-
-    threading.Thread(target=run_sync).start()
+    # Resolve now: attribute history is gone once the flush completes
+    keys = [(inst_id, section_name) for section_name in affected_shards(target) or [None]]
+
+    session = object_session(target)
+    if session is None:
+        for key in keys: reindex_scheduler.submit(key)
+        return
+    session.info.setdefault("reindex_keys", set()).update(keys)
+
+def dispatch_reindex(session):
+    """Session hook: the writes are durable now, so rebuilds read committed data."""
+    if session.in_nested_transaction(): return  # a savepoint ended, the real commit is still to come
+    for key in session.info.pop("reindex_keys", ()):
+        reindex_scheduler.submit(key)
+
+def discard_reindex(session):
+    """Session hook: rolled-back writes never reach the shards."""
+    if session.in_nested_transaction(): return  # savepoint only: keep the outer transaction's keys
+    session.info.pop("reindex_keys", None)
+
+def queue_reindex(session, inst_id, *sections):
+    """For bulk UPDATE/INSERT statements, which never fire the mapper listeners."""
+    session.info.setdefault("reindex_keys", set()).update((inst_id, s) for s in sections)
 
 # Registering the 'Observed Models'
 for model in [StudentModel, Staff, AttendanceLog, AcademicResult]:
@@ -122,41 +360,90 @@ for model in [StudentModel, Staff, AttendanceLog, AcademicResult]:
     event.listen(model, 'after_update', trigger_reindex)
     event.listen(model, 'after_delete', trigger_reindex)
 
-# --- API ENDPOINTS ---
+event.listen(SessionLocal, 'after_commit', dispatch_reindex)
+event.listen(SessionLocal, 'after_rollback', discard_reindex)
 
-@router.websocket("/ws/institution-sync/{inst_id}")
-async def sync_websocket(websocket: WebSocket, inst_id: int):
-    await websocket.accept()
+# --- API ENDPOINTS ---
 
+def read_or_build_registry(inst_id: int):
+    """Connect path: a cheap read; only a never-indexed institution is crawled."""
     db = SessionLocal()
     try:
-        # Initial Push
-        reg = perform_targeted_extraction(db, inst_id)
-        await websocket.send_json(reg)
+        return load_registry(db, inst_id) or perform_incremental_extraction(db, inst_id)
     finally: db.close()
 
-    if inst_id not in active_connections: active_connections[inst_id] = []
-    active_connections[inst_id].append(websocket)
+@router.websocket("/ws/institution-sync/{inst_id}")
+async def sync_websocket(websocket: WebSocket, inst_id: int, since: int = None):
+    """Clients resume with ?since=<registry version> and only receive what changed after it."""
+    await websocket.accept()
 
+    # Subscribe first so nothing published during the read is missed
+    conn = sync_hub.connect(inst_id, websocket)
     try:
+        # Initial Push (served from storage, off the event loop)
+        reg = await run_in_threadpool(read_or_build_registry, inst_id)
+        sync_hub.send(conn, "json", registry_delta(reg, since))
+
         while True:
             msg = await websocket.receive_text()
-            if msg == "ping": await websocket.send_text("pong")
-    except WebSocketDisconnect:
-        active_connections[inst_id].remove(websocket)
+            if msg == "ping": sync_hub.send(conn, "text", "pong")
+            elif msg == '{"type":"ping"}': sync_hub.send(conn, "json", {"type": "pong"})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sync_hub.disconnect(conn)
+
+def etag_matches(if_none_match: str, etag: str):
+    """If-None-Match check: '*' or any listed (weak or strong) tag equal to ours."""
+    if not if_none_match or not etag:
+        return False
+    tags = [t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
 @router.get("/shard/{inst_id}/{section_name}")
-async def get_shard(inst_id: int, section_name: str, key: str, db: Session = Depends(get_db)):
-    state = db.query(InstitutionState).filter_by(institution_id=inst_id).first()
-    if not state: raise HTTPException(status_code=404)
+def get_shard(inst_id: int, section_name: str, key: str, request: Request, db: Session = Depends(get_db)):
+    shard = db.query(InstitutionShard).filter_by(institution_id=inst_id, shard_name=section_name).first()
 
-    registry = json.loads(state.key_registry)
-    shard_info = registry.get("shards", {}).get(section_name)
+    if not shard:
+        # Institutions indexed before per-shard storage still hold one big blob.
+        # Plain read first: only the registered key of a not-yet-migrated shard
+        # may reach the locking migration, anything else is refused right here
+        legacy_registry = db.query(InstitutionState.key_registry).filter(
+            InstitutionState.institution_id == inst_id,
+            InstitutionState.full_data_blob.notin_(("", "{}"))
+        ).scalar()
+        info = json.loads(legacy_registry).get("shards", {}).get(section_name) if legacy_registry else None
+        if not info or info.get("mode") == "delete" or info.get("key") != key:
+            raise HTTPException(status_code=403, detail="Key Mismatch")
 
-    if not shard_info or shard_info['key'] != key:
+        # (locked: a concurrent request waits, then finds the blob already emptied)
+        with registry_lock(db, inst_id):
+            state = lock_state(db, inst_id)
+            if not state: raise HTTPException(status_code=404)
+            registry = json.loads(state.key_registry)
+            migrate_legacy_blob(db, state, registry)
+            state.key_registry = json.dumps(registry)
+            db.commit()
+        shard = db.query(InstitutionShard).filter_by(institution_id=inst_id, shard_name=section_name).first()
+
+    if not shard or shard.key != key:
         raise HTTPException(status_code=403, detail="Key Mismatch")
 
-    all_data = json.loads(state.full_data_blob)
-    if section_name == "personal_state":
-        return all_data.get("personal_state")
-    return all_data.get("sections", {}).get(section_name)
\ No newline at end of file
+    if not shard.etag:
+        # Row written before content hashing existed
+        encode_shard(shard)
+        db.commit()
+
+    headers = {"ETag": f'"{shard.etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), shard.etag):
+        return Response(status_code=304, headers=headers)
+
+    # Stored pre-serialized and pre-compressed: hand the bytes straight back
+    accepted = request.headers.get("accept-encoding", "")
+    if shard.payload_br and "br" in accepted:
+        return Response(content=shard.payload_br, media_type="application/json",
+                        headers={**headers, "Content-Encoding": "br"})
+    if shard.payload_gzip and "gzip" in accepted:
+        return Response(content=shard.payload_gzip, media_type="application/json",
+                        headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=shard.payload, media_type="application/json", headers=headers)
@@ -0,0 +1,75 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REINDEX_DEBOUNCE_SECONDS = float(os.getenv("REINDEX_DEBOUNCE_SECONDS", "0.5"))
+REINDEX_MAX_WAIT_SECONDS = float(os.getenv("REINDEX_MAX_WAIT_SECONDS", "5"))
+REINDEX_MAX_WORKERS = int(os.getenv("REINDEX_MAX_WORKERS", "4"))
+
+
+class DebouncedScheduler:
+    """
+    Coalescing background runner:
+    1. submit(key) marks a key dirty; repeated submits inside the debounce
+       window collapse into one run (capped by max_wait so a steady stream
+       of events cannot starve it).
+    2. A bounded pool runs the handler, never twice at once for the same key.
+    3. A key submitted while it is running is re-queued once afterwards.
+    """
+
+    def __init__(self, handler, debounce=REINDEX_DEBOUNCE_SECONDS,
+                 max_wait=REINDEX_MAX_WAIT_SECONDS, max_workers=REINDEX_MAX_WORKERS):
+        self.handler = handler
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self._pending = {}  # key -> (due_at, first_seen)
+        self._running = set()
+        self._rerun = set()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reindex")
+        self._dispatcher = None
+
+    def submit(self, key):
+        now = time.monotonic()
+        with self._cond:
+            if key in self._running:
+                self._rerun.add(key)
+                return
+            first_seen = self._pending.get(key, (None, now))[1]
+            self._pending[key] = (min(now + self.debounce, first_seen + self.max_wait), first_seen)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="reindex-dispatch", daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending) + len(self._running)
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [k for k, (due_at, _) in self._pending.items() if due_at <= now]
+                for key in due:
+                    del self._pending[key]
+                    self._running.add(key)
+                    self._pool.submit(self._run, key)
+
+                waiting = [due_at for due_at, _ in self._pending.values()]
+                self._cond.wait(timeout=max(min(waiting) - now, 0) if waiting else None)
+
+    def _run(self, key):
+        try:
+            self.handler(key)
+        except Exception as e:
+            print(f"Reindex Error {key}: {e}")
+        finally:
+            with self._cond:
+                self._running.discard(key)
+                if key in self._rerun:
+                    self._rerun.discard(key)
+                    now = time.monotonic()
+                    self._pending[key] = (now + self.debounce, now)
+                self._cond.notify()
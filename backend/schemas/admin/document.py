@@ -1,8 +1,8 @@
 from pydantic import ConfigDict
 from typing import Dict, Any
 from datetime import datetime , date
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 
 from backend.models.admin.document import VoucherMode
 
@@ -95,6 +95,21 @@ class BulkDeployPayload(BaseModel):
     mode: str # 'student', 'staff', or 'custom'
     vouchers: List[VoucherDraft]
 
+# --- Billing engine: a reusable charge structure, expanded into vouchers server-side ---
+class TemplateHead(BaseModel):
+    name: str
+    amount: float = 0
+    # "student_fee": the amount is each student's own fee from the students table
+    source: Optional[Literal["student_fee"]] = None
+
+class FinanceTemplateCreate(BaseModel):
+    mode: Literal["student", "staff"] = "student"
+    target_group: str = "all"  # a section name, or 'all'
+    billing_month: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}$")  # default period, 'YYYY-MM'
+    heads: List[TemplateHead] = Field(..., min_length=1)
+    issue_date: Optional[str] = None
+    due_date: Optional[str] = None
+
 class VoucherResponse(BaseModel):
     id: int
     name: str
@@ -0,0 +1,57 @@
+import json
+import datetime
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+# orjson is the fast path. The stdlib fallback emits equivalent JSON but not
+# always the same bytes (float exponents like 1e+16 vs 1e16, ints past 64 bits
+# that orjson rejects), so shard keys/ETags can differ between the two.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def _default(o):
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    return str(o)
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON with native date/datetime handling."""
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps_str(obj) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """Response class that skips jsonable_encoder: hand it plain dicts/lists."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def column_rows(db: Session, model, *criteria, order_by=None, columns=None, limit=None):
+    """
+    Column-only load: plain dicts keyed by attribute name, no ORM objects,
+    identity map or per-row inspect(). Ordered by id unless told otherwise.
+    `columns` narrows the SELECT to those attribute names, `limit` caps rows.
+    """
+    attrs = [a for a in inspect(model).column_attrs if columns is None or a.key in columns]
+    stmt = select(*[a.columns[0].label(a.key) for a in attrs]).where(*criteria)
+    stmt = stmt.order_by(*(order_by if order_by is not None else [model.id]))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [dict(m) for m in db.execute(stmt).mappings()]
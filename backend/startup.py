@@ -0,0 +1,112 @@
+import os
+import time
+import hashlib
+import datetime
+from contextlib import contextmanager
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select
+
+# ⏱️ Boot clock starts the moment main.py imports this module
+BOOT_STARTED = time.perf_counter()
+
+# How the schema is handled at boot (changes are applied by the one-off
+# `python -m backend.migrations.schema`, never by a booting worker):
+#   auto      -> compare a metadata fingerprint with the stored one; warn on mismatch
+#   strict    -> same check, but refuse to start on mismatch
+#   create_all-> the old behaviour (reflect every table on every boot)
+#   skip      -> trust the database completely
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "auto")
+
+
+class StartupTimer:
+    """Collects per-phase boot timings: imports, schema, password policy, ..."""
+
+    def __init__(self):
+        self.phases = {}
+        self._last = BOOT_STARTED
+
+    def mark(self, name):
+        """Time since the previous mark/phase (used for the import block)."""
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self.phases[name] = round((self._last - started) * 1000, 1)
+
+    def total_ms(self):
+        return round((time.perf_counter() - BOOT_STARTED) * 1000, 1)
+
+    def report(self):
+        steps = " | ".join(f"{name} {ms:.0f} ms" for name, ms in self.phases.items())
+        print(f"⏱️ Startup: {steps} | total {self.total_ms():.0f} ms")
+        return {"phases_ms": dict(self.phases), "total_ms": self.total_ms()}
+
+
+startup_timer = StartupTimer()
+
+# Kept out of Base.metadata so it never changes the fingerprint it stores
+_schema_meta = MetaData()
+schema_version_table = Table(
+    "app_schema_version", _schema_meta,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime),
+)
+
+
+def schema_fingerprint(metadata):
+    """Stable hash of every table, column (name + type) and index the models declare."""
+    parts = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type!r}:{c.nullable}" for c in table.columns)
+        parts.extend(sorted(i.name or "" for i in table.indexes))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def stored_fingerprint(engine):
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(schema_version_table.c.fingerprint).where(schema_version_table.c.id == 1)).scalar()
+    except Exception:
+        return None  # table not there yet -> first boot on this database
+
+
+def record_fingerprint(engine, fingerprint):
+    _schema_meta.create_all(bind=engine)
+    with engine.begin() as conn:
+        table = schema_version_table
+        values = {"fingerprint": fingerprint, "applied_at": datetime.datetime.utcnow()}
+        if conn.execute(select(table.c.id).where(table.c.id == 1)).scalar() is None:
+            conn.execute(table.insert().values(id=1, **values))
+        else:
+            conn.execute(table.update().where(table.c.id == 1).values(**values))
+
+
+def ensure_schema(engine, metadata, mode=DB_SCHEMA_MODE):
+    """
+    Replaces the unconditional create_all at import: one indexed SELECT on
+    the version row. A mismatch means the migration step of this deploy has
+    not run yet; every worker running DDL at once would race (and build
+    indexes before serving), so boot only reports it.
+    """
+    if mode == "skip":
+        return "skipped"
+    if mode == "create_all":
+        metadata.create_all(bind=engine)
+        return "create_all"
+
+    if stored_fingerprint(engine) == schema_fingerprint(metadata):
+        return "up to date"
+
+    message = "Schema is behind the models: run `python -m backend.migrations.schema`"
+    if mode == "strict":
+        raise RuntimeError(message)
+    print(f"⚠️ {message}")
+    return "out of date"
@@ -0,0 +1,115 @@
+import os
+import asyncio
+import threading
+from collections import defaultdict
+
+SYNC_SEND_BUFFER = int(os.getenv("SYNC_SEND_BUFFER", "16"))
+SYNC_SEND_TIMEOUT = float(os.getenv("SYNC_SEND_TIMEOUT", "10"))
+
+# 1013 = "Try Again Later": the client reconnects and resyncs from scratch
+SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+class SyncConnection:
+    """One socket + its own bounded outbox, drained by a dedicated sender task."""
+
+    def __init__(self, inst_id, websocket, buffer_size):
+        self.inst_id = inst_id
+        self.websocket = websocket
+        self.loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue(maxsize=buffer_size)
+        self.sender = None
+        self.closed = False
+
+
+class SyncHub:
+    """
+    Broadcast hub for /state/ws/institution-sync:
+    1. Reindex workers call publish() from any thread; the message is handed
+       to the event loop owning each socket with call_soon_threadsafe.
+    2. Fan-out only enqueues, so every connection sends concurrently.
+    3. A client whose outbox is full, or whose send stalls past the timeout,
+       is dropped instead of holding up the rest of its institution.
+    """
+
+    def __init__(self, buffer_size=SYNC_SEND_BUFFER, send_timeout=SYNC_SEND_TIMEOUT):
+        self.buffer_size = buffer_size
+        self.send_timeout = send_timeout
+        self.connections = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def connect(self, inst_id, websocket):
+        """Called from the WebSocket handler (inside the event loop)."""
+        conn = SyncConnection(inst_id, websocket, self.buffer_size)
+        conn.sender = asyncio.create_task(self._sender(conn))
+        with self._lock:
+            self.connections[inst_id].add(conn)
+        return conn
+
+    def disconnect(self, conn):
+        conn.closed = True
+        with self._lock:
+            peers = self.connections.get(conn.inst_id)
+            if peers is not None:
+                peers.discard(conn)
+                if not peers:
+                    del self.connections[conn.inst_id]
+        if conn.sender and conn.sender is not asyncio.current_task():
+            conn.sender.cancel()
+
+    def publish(self, inst_id, message):
+        """Thread-safe entry point for background workers."""
+        with self._lock:
+            loops = {conn.loop for conn in self.connections.get(inst_id, ())}
+        for loop in loops:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._fan_out, inst_id, loop, ("json", message))
+
+    def send(self, conn, kind, payload):
+        """Queues a direct reply (e.g. pong) behind any pending broadcasts."""
+        self._enqueue(conn, (kind, payload))
+
+    def _fan_out(self, inst_id, loop, item):
+        with self._lock:
+            peers = [conn for conn in self.connections.get(inst_id, ()) if conn.loop is loop]
+        for conn in peers:
+            self._enqueue(conn, item)
+
+    def _enqueue(self, conn, item):
+        if conn.closed:
+            return
+        try:
+            conn.outbox.put_nowait(item)
+        except asyncio.QueueFull:
+            print(f"Sync Hub: dropping slow client for institution {conn.inst_id}")
+            self._drop(conn)
+
+    def _drop(self, conn):
+        self.disconnect(conn)
+        asyncio.ensure_future(self._close(conn.websocket))
+
+    async def _close(self, websocket):
+        try:
+            await websocket.close(code=SLOW_CLIENT_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def _sender(self, conn):
+        while not conn.closed:
+            kind, payload = await conn.outbox.get()
+            try:
+                if kind == "text":
+                    await asyncio.wait_for(conn.websocket.send_text(payload), self.send_timeout)
+                else:
+                    await asyncio.wait_for(conn.websocket.send_json(payload), self.send_timeout)
+            except asyncio.TimeoutError:
+                print(f"Sync Hub: send timed out for institution {conn.inst_id}")
+                self._drop(conn)
+                return
+            except Exception as e:
+                print(f"Sync Hub: send failed for institution {conn.inst_id}: {e}")
+                self.disconnect(conn)
+                return
+
+
+sync_hub = SyncHub()